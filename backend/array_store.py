@@ -0,0 +1,64 @@
+import os
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def array_path(stem: str, name: str) -> str:
+    return f"{stem}.{name}.npy"
+
+
+def write_arrays(stem: str, arrays: Dict[str, np.ndarray]) -> List[str]:
+    """
+    Write each array as `{stem}.{name}.npy`. All are written to temp files first
+    and then renamed into place, so readers that have the old files mapped are
+    unaffected and a failed write leaves the previous set intact.
+    """
+    staged = []
+    for name, array in arrays.items():
+        path = array_path(stem, name)
+        tmp_path = f"{path}.tmp.npy"
+        np.save(tmp_path, np.asarray(array))
+        staged.append((tmp_path, path))
+    for tmp_path, path in staged:
+        os.replace(tmp_path, path)
+    return [path for _tmp_path, path in staged]
+
+
+def load_arrays(stem: str, names: Sequence[str], mmap: bool = True) -> Optional[Dict[str, np.ndarray]]:
+    """Arrays written by write_arrays (memory-mapped read-only by default), or None if any is missing."""
+    arrays: Dict[str, np.ndarray] = {}
+    for name in names:
+        path = array_path(stem, name)
+        if not os.path.exists(path):
+            return None
+        try:
+            arrays[name] = np.load(path, mmap_mode="r" if mmap else None)
+        except ValueError:
+            # numpy refuses to map a zero-length array
+            arrays[name] = np.load(path)
+    return arrays
+
+
+def load_legacy_npz(path: str) -> Optional[Dict[str, np.ndarray]]:
+    # Sidecars from indexes built before the per-array layout; read fully into memory
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        return {k: data[k] for k in data.files}
+
+
+def remove_legacy_npz(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+__all__ = [
+    "array_path",
+    "write_arrays",
+    "load_arrays",
+    "load_legacy_npz",
+    "remove_legacy_npz",
+]
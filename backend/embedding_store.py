@@ -0,0 +1,82 @@
+import os
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+
+def embeddings_path(prefix: str) -> str:
+    return f"{prefix}.emb.npy"
+
+
+class EmbeddingWriter:
+    """
+    Writes the normalized float32 embedding matrix for an index as `{prefix}.emb.npy`,
+    row i = internal id i (unused ids are zero rows). Newly encoded vectors are
+    appended to a scratch file as they stream in, since the final row count is
+    only known once the jobs file has been read; `finish` lays everything out in
+    a memory-mapped temp file that `commit` renames into place.
+    """
+
+    def __init__(self, prefix: str, dim: int):
+        self.path = embeddings_path(prefix)
+        self.dim = dim
+        self._scratch_path = f"{self.path}.new.tmp"
+        self._scratch = open(self._scratch_path, "wb")
+        self._ids: List[int] = []
+        self._tmp_path = f"{self.path}.tmp.npy"
+        self.matrix: Optional[np.ndarray] = None
+
+    def append(self, vectors: np.ndarray, ids: Sequence[int]) -> None:
+        self._scratch.write(np.ascontiguousarray(vectors, dtype="float32").tobytes())
+        self._ids.extend(int(i) for i in ids)
+
+    def finish(self, num_rows: int, carried: Iterator[Tuple[np.ndarray, List[int]]]) -> np.ndarray:
+        """Build the full matrix from the appended vectors plus `carried` (vectors, ids) chunks."""
+        self._scratch.close()
+        matrix = open_memmap(self._tmp_path, mode="w+", dtype="float32", shape=(num_rows, self.dim))
+        if self._ids:
+            new = np.memmap(self._scratch_path, dtype="float32", mode="r", shape=(len(self._ids), self.dim))
+            ids = np.asarray(self._ids, dtype="int64")
+            for start in range(0, len(ids), 4096):
+                matrix[ids[start:start + 4096]] = new[start:start + 4096]
+            del new
+        for vectors, ids in carried:
+            matrix[np.asarray(ids, dtype="int64")] = vectors
+        os.remove(self._scratch_path)
+        self.matrix = matrix
+        return matrix
+
+    def commit(self) -> str:
+        if self.matrix is not None:
+            self.matrix.flush()
+            self.matrix = None
+        os.replace(self._tmp_path, self.path)
+        return self.path
+
+
+def load_embeddings(prefix: str, mmap: bool = True) -> Optional[np.ndarray]:
+    """The stored embedding matrix (memory-mapped read-only by default), or None if absent."""
+    path = embeddings_path(prefix)
+    if not os.path.exists(path):
+        return None
+    try:
+        return np.load(path, mmap_mode="r" if mmap else None)
+    except ValueError:
+        # numpy refuses to map a zero-length array
+        return np.load(path)
+
+
+def iter_rows(matrix: np.ndarray, ids: List[int], chunk_size: int = 4096) -> Iterator[Tuple[np.ndarray, List[int]]]:
+    """Yield (vectors, ids) chunks of `matrix` rows, e.g. to feed an index rebuild."""
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        yield np.ascontiguousarray(matrix[np.asarray(chunk, dtype="int64")], dtype="float32"), chunk
+
+
+__all__ = [
+    "embeddings_path",
+    "EmbeddingWriter",
+    "load_embeddings",
+    "iter_rows",
+]
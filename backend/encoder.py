@@ -0,0 +1,262 @@
+import os
+import time
+import multiprocessing
+from collections import deque
+from itertools import chain, islice
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.model_registry import get_model
+
+
+DEFAULT_TOKEN_BUDGET = int(os.environ.get("WAT_MATCH_TOKEN_BUDGET", "16384"))
+DEFAULT_MAX_BATCH_SIZE = 256
+# Below this many texts a process pool costs more (spawn + model load per worker) than it saves
+PARALLEL_MIN_TEXTS = int(os.environ.get("WAT_MATCH_PARALLEL_MIN_TEXTS", "2000"))
+DEFAULT_SHARD_SIZE = 512
+
+
+def token_lengths(model: Any, texts: Sequence[str]) -> np.ndarray:
+    """Per-text token counts as the encoder will see them (special tokens, truncation included)."""
+    max_len = int(getattr(model, "max_seq_length", None) or 512)
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is None:
+        # Rough fallback: whitespace tokens plus [CLS]/[SEP]
+        return np.asarray([min(len(t.split()) + 2, max_len) for t in texts], dtype="int64")
+    enc = tokenizer(list(texts), add_special_tokens=True, truncation=True, max_length=max_len)
+    return np.asarray([len(ids) for ids in enc["input_ids"]], dtype="int64")
+
+
+def plan_batches(
+    lengths: np.ndarray,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+) -> List[np.ndarray]:
+    """
+    Group text positions longest-first so each batch's padded size
+    (len(batch) * longest member) stays within `token_budget`.
+    """
+    order = np.argsort(-lengths, kind="stable")
+    batches: List[np.ndarray] = []
+    current: List[int] = []
+    current_max = 0
+    for idx in order.tolist():
+        length = max(int(lengths[idx]), 1)
+        longest = max(current_max, length)
+        if current and (longest * (len(current) + 1) > token_budget or len(current) >= max_batch_size):
+            batches.append(np.asarray(current, dtype="int64"))
+            current = []
+            longest = length
+        current.append(idx)
+        current_max = longest
+    if current:
+        batches.append(np.asarray(current, dtype="int64"))
+    return batches
+
+
+def _padded_tokens(lengths: np.ndarray, batches: List[np.ndarray]) -> int:
+    return int(sum(int(lengths[b].max()) * len(b) for b in batches if len(b)))
+
+
+def encode_bucketed(
+    model: Any,
+    texts: Sequence[str],
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    baseline_batch_size: int = 64,
+    show_progress_bar: bool = False,
+) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """
+    Encode `texts` in length-sorted, token-budgeted batches and return the raw
+    (unnormalized) embeddings in the original order, plus padding/throughput stats.
+    `baseline_batch_size` is only used to report the padding a fixed-size,
+    scrape-order batching would have incurred on the same texts.
+    """
+    start = time.perf_counter()
+    lengths = token_lengths(model, texts)
+    batches = plan_batches(lengths, token_budget=token_budget, max_batch_size=max_batch_size)
+
+    iterator = batches
+    if show_progress_bar:
+        from tqdm import tqdm
+        iterator = tqdm(batches, desc="Batches")
+
+    out: Optional[np.ndarray] = None
+    for batch in iterator:
+        emb = model.encode(
+            [texts[i] for i in batch.tolist()],
+            batch_size=len(batch),
+            show_progress_bar=False,
+            convert_to_numpy=True,
+        )
+        if out is None:
+            out = np.empty((len(texts), emb.shape[1]), dtype="float32")
+        out[batch] = emb
+    if out is None:
+        out = np.zeros((0, 0), dtype="float32")
+    elapsed = time.perf_counter() - start
+
+    real_tokens = int(lengths.sum())
+    padded_tokens = _padded_tokens(lengths, batches)
+    fixed = [np.arange(i, min(i + baseline_batch_size, len(texts))) for i in range(0, len(texts), baseline_batch_size)]
+    fixed_padded = _padded_tokens(lengths, fixed)
+    stats = {
+        "num_texts": len(texts),
+        "num_batches": len(batches),
+        "token_budget": int(token_budget),
+        "real_tokens": real_tokens,
+        "padded_tokens": padded_tokens,
+        "padding_waste": (1.0 - real_tokens / padded_tokens) if padded_tokens else 0.0,
+        "fixed_batch_padding_waste": (1.0 - real_tokens / fixed_padded) if fixed_padded else 0.0,
+        "seconds": round(elapsed, 3),
+        "tokens_per_sec": (real_tokens / elapsed) if elapsed > 0 else 0.0,
+    }
+    return out, stats
+
+
+def merge_encode_stats(parts: List[Dict[str, Any]], seconds: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Combine per-shard stats into one summary. `seconds` is the time spent
+    encoding; by default the shards' own encode times, summed.
+    """
+    if seconds is None:
+        seconds = sum(p["seconds"] for p in parts)
+    real = sum(p["real_tokens"] for p in parts)
+    padded = sum(p["padded_tokens"] for p in parts)
+    fixed_waste = [p["fixed_batch_padding_waste"] * p["real_tokens"] for p in parts]
+    return {
+        "num_texts": sum(p["num_texts"] for p in parts),
+        "num_batches": sum(p["num_batches"] for p in parts),
+        "token_budget": parts[0]["token_budget"] if parts else 0,
+        "real_tokens": real,
+        "padded_tokens": padded,
+        "padding_waste": (1.0 - real / padded) if padded else 0.0,
+        # Token-weighted average; exact enough for a comparison figure
+        "fixed_batch_padding_waste": (sum(fixed_waste) / real) if real else 0.0,
+        "seconds": round(seconds, 3),
+        "tokens_per_sec": (real / seconds) if seconds > 0 else 0.0,
+    }
+
+
+# Per-process encoder used by pool workers (set by _init_worker)
+_WORKER_MODEL: Any = None
+
+
+def _init_worker(model_name: str, device: Optional[str], backend: Optional[str], num_threads: int) -> None:
+    global _WORKER_MODEL
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except Exception:
+        pass
+    _WORKER_MODEL = get_model(model_name, device, backend)
+
+
+def _encode_shard(texts: List[str], token_budget: int) -> Tuple[np.ndarray, Dict[str, Any]]:
+    return encode_bucketed(_WORKER_MODEL, texts, token_budget=token_budget)
+
+
+def _shards(texts: Iterable[str], shard_size: int) -> Iterator[List[str]]:
+    shard: List[str] = []
+    for text in texts:
+        shard.append(text)
+        if len(shard) >= shard_size:
+            yield shard
+            shard = []
+    if shard:
+        yield shard
+
+
+def iter_encoded_shards(
+    texts: Iterable[str],
+    model_name: str,
+    workers: int = 1,
+    device: Optional[str] = None,
+    backend: Optional[str] = None,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    min_parallel_texts: int = PARALLEL_MIN_TEXTS,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Iterator[np.ndarray]:
+    """
+    Yield raw embeddings for consecutive shards of `texts`, in order. `texts`
+    may be any iterable (e.g. a generator over a streamed jobs file); only the
+    shards in flight are held in memory. With `workers` > 1 and at least
+    `min_parallel_texts` texts, shards are encoded by a pool of spawned processes
+    that each load their own model copy; at most two shards per worker are in
+    flight so results stream back as they complete. Otherwise everything runs in
+    this process. Merged stats land in `stats`; their time covers encoding only,
+    not what the consumer does between shards.
+    """
+    parts: List[Dict[str, Any]] = []
+    parallel = False
+    if workers > 1:
+        # Peek far enough to know whether the input clears the threshold
+        texts = iter(texts)
+        head = list(islice(texts, min_parallel_texts))
+        parallel = len(head) >= min_parallel_texts
+        texts = chain(head, texts)
+    if not parallel:
+        model = None
+        for shard in _shards(texts, shard_size):
+            if model is None:
+                # Loaded lazily so an input with nothing to encode never touches the model
+                model = get_model(model_name, device, backend)
+            emb, shard_stats = encode_bucketed(model, shard, token_budget=token_budget)
+            parts.append(shard_stats)
+            yield emb
+    else:
+        threads = max(1, (os.cpu_count() or workers) // workers)
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(model_name, device, backend, threads),
+        ) as pool:
+            in_flight: Deque[Future] = deque()
+            waited = 0.0
+            for shard in _shards(texts, shard_size):
+                in_flight.append(pool.submit(_encode_shard, shard, token_budget))
+                if len(in_flight) >= workers * 2:
+                    start = time.perf_counter()
+                    emb, shard_stats = in_flight.popleft().result()
+                    waited += time.perf_counter() - start
+                    parts.append(shard_stats)
+                    yield emb
+            while in_flight:
+                start = time.perf_counter()
+                emb, shard_stats = in_flight.popleft().result()
+                waited += time.perf_counter() - start
+                parts.append(shard_stats)
+                yield emb
+    seconds = None
+    if parallel:
+        # Workers keep encoding while the consumer runs, so the waits alone can undercount;
+        # they can't beat the workers' summed encode time spread evenly over the pool
+        seconds = max(waited, sum(p["seconds"] for p in parts) / workers)
+    if stats is not None:
+        stats.update(merge_encode_stats(parts, seconds))
+        stats["workers"] = workers if parallel else 1
+
+
+def format_encode_stats(stats: Dict[str, Any]) -> str:
+    return (
+        f"Encoded {stats['num_texts']} texts in {stats['num_batches']} batches, "
+        f"{stats['seconds']:.2f}s ({stats['tokens_per_sec']:.0f} tokens/s); "
+        f"padding waste {stats['padding_waste']:.1%} "
+        f"(fixed batches would waste {stats['fixed_batch_padding_waste']:.1%})"
+    )
+
+
+__all__ = [
+    "token_lengths",
+    "plan_batches",
+    "encode_bucketed",
+    "merge_encode_stats",
+    "iter_encoded_shards",
+    "format_encode_stats",
+]
@@ -0,0 +1,19 @@
+import os
+
+
+# Spellings that switch an on/off environment toggle off; anything else set switches it on
+FALSE_VALUES = frozenset({"0", "false", "no", "off"})
+
+
+def env_flag(name: str, default: bool = True) -> bool:
+    """On/off switch from environment variable `name`; unset or blank means `default`."""
+    value = os.environ.get(name, "").strip().lower()
+    if not value:
+        return default
+    return value not in FALSE_VALUES
+
+
+__all__ = [
+    "FALSE_VALUES",
+    "env_flag",
+]
@@ -0,0 +1,264 @@
+import re
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import faiss  # type: ignore
+
+from backend.array_store import load_arrays, load_legacy_npz, remove_legacy_npz, write_arrays
+
+
+# Hours per year used to compare salaried postings with hourly ones
+HOURS_PER_YEAR = 2080
+_DEADLINE_FORMATS = (
+    "%b %d, %Y %I:%M %p",
+    "%B %d, %Y %I:%M %p",
+    "%b %d, %Y",
+    "%B %d, %Y",
+    "%Y-%m-%d %I:%M %p",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+    "%m/%d/%Y",
+)
+_EPOCH = date(1970, 1, 1)
+_MONEY_RE = re.compile(r"\$\s*(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s*(k)?", re.IGNORECASE)
+_INT_RE = re.compile(r"\d+")
+FILTER_KEYS = (
+    "cities",
+    "levels",
+    "title_include",
+    "title_exclude",
+    "min_hourly_pay",
+    "min_openings",
+    "deadline_after",
+)
+ATTRIBUTE_ARRAYS = (
+    "present",
+    "city",
+    "city_vocab",
+    "level_bits",
+    "level_vocab",
+    "deadline",
+    "openings",
+    "hourly_pay",
+    "title",
+)
+
+
+def attributes_path(prefix: str) -> str:
+    """Stem of the attribute sidecar; each column is stored as `{stem}.{name}.npy`."""
+    return f"{prefix}.attrs"
+
+
+def parse_deadline(value: Any) -> int:
+    """Deadline as days since 1970-01-01, or -1 when it can't be parsed."""
+    text = str(value or "").strip()
+    if not text or text == "N/A":
+        return -1
+    for fmt in _DEADLINE_FORMATS:
+        try:
+            return (datetime.strptime(text, fmt).date() - _EPOCH).days
+        except ValueError:
+            continue
+    m = re.search(r"(\d{4})-(\d{2})-(\d{2})", text)
+    if m:
+        try:
+            return (date(int(m.group(1)), int(m.group(2)), int(m.group(3))) - _EPOCH).days
+        except ValueError:
+            return -1
+    return -1
+
+
+def parse_hourly_pay(text: Any) -> float:
+    """
+    Highest dollar figure in a compensation blurb, as an hourly rate (amounts
+    over 1000 are treated as annual). NaN when no amount is stated.
+    """
+    best = float("nan")
+    for amount, thousands in _MONEY_RE.findall(str(text or "")):
+        value = float(amount.replace(",", ""))
+        if thousands:
+            value *= 1000
+        if value > 1000:
+            value /= HOURS_PER_YEAR
+        if np.isnan(best) or value > best:
+            best = value
+    return best
+
+
+def _split_levels(value: Any) -> List[str]:
+    return [p.strip().lower() for p in re.split(r"[,/\n]", str(value or "")) if p.strip() and p.strip() != "N/A"]
+
+
+class AttributeBuilder:
+    """
+    Collects structured fields per internal id into columns: city as a category
+    code, levels as a bitmask, deadline as epoch days, openings, hourly pay and
+    the lowercased title. Unknown values are -1 / NaN / empty.
+    """
+
+    def __init__(self):
+        self._rows: Dict[int, Dict[str, Any]] = {}
+        self._cities: Dict[str, int] = {}
+        self._levels: Dict[str, int] = {}
+
+    def add(self, internal_id: int, job: Dict[str, Any]) -> None:
+        details = job.get("details") or {}
+        city = str(job.get("city") or "").strip().lower()
+        level_bits = 0
+        for level in _split_levels(job.get("level") or details.get("level")):
+            bit = self._levels.setdefault(level, len(self._levels))
+            if bit < 63:
+                level_bits |= 1 << bit
+        openings = _INT_RE.search(str(job.get("openings") or details.get("number_of_job_openings") or ""))
+        self._rows[internal_id] = {
+            "city": self._cities.setdefault(city, len(self._cities)) if city and city != "n/a" else -1,
+            "level_bits": level_bits,
+            "deadline": parse_deadline(job.get("deadline") or details.get("application_deadline")),
+            "openings": int(openings.group()) if openings else -1,
+            "hourly_pay": parse_hourly_pay(details.get("compensation_and_benefits")),
+            "title": str(job.get("title") or details.get("job_title") or "").lower(),
+        }
+
+    def finish(self, num_rows: int) -> Dict[str, np.ndarray]:
+        present = np.zeros(num_rows, dtype=bool)
+        city = np.full(num_rows, -1, dtype="int32")
+        level_bits = np.zeros(num_rows, dtype="int64")
+        deadline = np.full(num_rows, -1, dtype="int32")
+        openings = np.full(num_rows, -1, dtype="int32")
+        hourly_pay = np.full(num_rows, np.nan, dtype="float32")
+        titles = [""] * num_rows
+        for iid, row in self._rows.items():
+            present[iid] = True
+            city[iid] = row["city"]
+            level_bits[iid] = row["level_bits"]
+            deadline[iid] = row["deadline"]
+            openings[iid] = row["openings"]
+            hourly_pay[iid] = row["hourly_pay"]
+            titles[iid] = row["title"]
+        return {
+            "present": present,
+            "city": city,
+            "city_vocab": np.asarray(sorted(self._cities, key=self._cities.get), dtype=str),
+            "level_bits": level_bits,
+            "level_vocab": np.asarray(sorted(self._levels, key=self._levels.get), dtype=str),
+            "deadline": deadline,
+            "openings": openings,
+            "hourly_pay": hourly_pay,
+            "title": np.asarray(titles, dtype=str),
+        }
+
+
+def write_attributes(prefix: str, arrays: Dict[str, np.ndarray]) -> str:
+    stem = attributes_path(prefix)
+    write_arrays(stem, {name: arrays[name] for name in ATTRIBUTE_ARRAYS})
+    remove_legacy_npz(f"{stem}.npz")
+    return stem
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = [value]
+    return [str(v).strip().lower() for v in value if str(v).strip()]
+
+
+def has_filters(spec: Optional[Dict[str, Any]]) -> bool:
+    return bool(spec) and any(spec.get(k) not in (None, "", []) for k in FILTER_KEYS)
+
+
+class AttributeIndex:
+    """
+    Evaluates a filter spec (the `filters:` block of config.yaml) against the
+    attribute columns and returns a boolean mask over internal ids. Category and
+    level predicates are evaluated once over their small vocabularies and then
+    broadcast through the code columns, so cost is a few vector ops per filter.
+    Jobs whose value for a filtered field is unknown are kept.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.arrays = arrays
+        self.num_rows = len(arrays["present"])
+
+    def mask(self, spec: Dict[str, Any]) -> np.ndarray:
+        a = self.arrays
+        keep = np.array(a["present"], dtype=bool)
+
+        cities = _as_list(spec.get("cities"))
+        if cities:
+            vocab = a["city_vocab"]
+            allowed = np.asarray([any(c in v for c in cities) for v in vocab.tolist()] + [True], dtype=bool)
+            # Code -1 (unknown city) indexes the trailing True
+            keep &= allowed[a["city"]]
+
+        levels = _as_list(spec.get("levels"))
+        if levels:
+            wanted = 0
+            for bit, name in enumerate(a["level_vocab"].tolist()):
+                if any(level in name for level in levels):
+                    wanted |= 1 << bit
+            bits = a["level_bits"]
+            keep &= ((bits & wanted) != 0) | (bits == 0)
+
+        include = _as_list(spec.get("title_include"))
+        if include:
+            hit = np.zeros(self.num_rows, dtype=bool)
+            for term in include:
+                hit |= np.char.find(a["title"], term) >= 0
+            keep &= hit
+        for term in _as_list(spec.get("title_exclude")):
+            keep &= np.char.find(a["title"], term) < 0
+
+        min_pay = spec.get("min_hourly_pay")
+        if min_pay not in (None, ""):
+            pay = a["hourly_pay"]
+            keep &= np.isnan(pay) | (pay >= float(min_pay))
+
+        min_openings = spec.get("min_openings")
+        if min_openings not in (None, ""):
+            openings = a["openings"]
+            keep &= (openings < 0) | (openings >= int(min_openings))
+
+        deadline_after = spec.get("deadline_after")
+        if deadline_after not in (None, ""):
+            if str(deadline_after).lower() == "today":
+                cutoff = (date.today() - _EPOCH).days
+            else:
+                cutoff = parse_deadline(deadline_after)
+                if cutoff < 0:
+                    raise ValueError(f"Could not parse deadline_after filter: {deadline_after}")
+            deadline = a["deadline"]
+            keep &= (deadline < 0) | (deadline >= cutoff)
+        return keep
+
+
+def load_attributes(prefix: str, mmap: bool = True) -> Optional[AttributeIndex]:
+    """The attribute columns (memory-mapped read-only by default), or None if absent."""
+    stem = attributes_path(prefix)
+    arrays = load_arrays(stem, ATTRIBUTE_ARRAYS, mmap=mmap) or load_legacy_npz(f"{stem}.npz")
+    return AttributeIndex(arrays) if arrays is not None else None
+
+
+def id_selector(mask: np.ndarray) -> Tuple[faiss.IDSelector, np.ndarray]:
+    """
+    FAISS IDSelectorBitmap over `mask` (bit i set = internal id i allowed).
+    Returns (selector, bits); keep `bits` alive for as long as the selector is used.
+    """
+    bits = np.packbits(mask.astype(bool), bitorder="little")
+    return faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bits)), bits
+
+
+__all__ = [
+    "FILTER_KEYS",
+    "ATTRIBUTE_ARRAYS",
+    "attributes_path",
+    "parse_deadline",
+    "parse_hourly_pay",
+    "AttributeBuilder",
+    "write_attributes",
+    "has_filters",
+    "AttributeIndex",
+    "load_attributes",
+    "id_selector",
+]
@@ -0,0 +1,113 @@
+import os
+from typing import Any, Dict, Iterator, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+HASH_WIDTH = 40  # sha1 hex digest
+
+
+def id_map_path(prefix: str) -> str:
+    return f"{prefix}.idmap.npy"
+
+
+def write_id_map(prefix: str, internal_ids: Sequence[int], job_ids: Sequence[str], text_hashes: Sequence[str]) -> str:
+    """
+    Write the internal id -> (job id, text hash) table as a NumPy structured array
+    where row i describes internal id i (unused ids are empty rows). Written to a
+    temp file and renamed so readers that have the old file mapped are unaffected.
+    """
+    encoded_ids = [str(j).encode("utf-8") for j in job_ids]
+    width = max([len(j) for j in encoded_ids] + [1])
+    rows = (max(internal_ids) + 1) if len(internal_ids) else 0
+    table = np.zeros(rows, dtype=[("job_id", f"S{width}"), ("text_hash", f"S{HASH_WIDTH}")])
+    iids = np.asarray(internal_ids, dtype="int64")
+    table["job_id"][iids] = encoded_ids
+    table["text_hash"][iids] = [h.encode("ascii") for h in text_hashes]
+
+    path = id_map_path(prefix)
+    tmp_path = f"{path}.tmp.npy"
+    np.save(tmp_path, table)
+    os.replace(tmp_path, path)
+    return path
+
+
+class IdMap(Mapping[str, str]):
+    """
+    Read-only view of the id-map sidecar. Behaves like the old meta["id_to_job_id"]
+    dict (str(internal id) -> job id) so existing lookups keep working, without
+    materialising one Python string per posting.
+    """
+
+    def __init__(self, table: np.ndarray):
+        self._table = table
+
+    @classmethod
+    def from_dicts(cls, id_to_job_id: Dict[str, str], id_to_text_hash: Optional[Dict[str, str]] = None) -> "IdMap":
+        # Compatibility path for indexes whose mapping still lives in .meta.json
+        id_to_text_hash = id_to_text_hash or {}
+        keys = [int(k) for k in id_to_job_id]
+        width = max([len(str(v).encode("utf-8")) for v in id_to_job_id.values()] + [1])
+        table = np.zeros((max(keys) + 1) if keys else 0, dtype=[("job_id", f"S{width}"), ("text_hash", f"S{HASH_WIDTH}")])
+        for key, job_id in id_to_job_id.items():
+            table[int(key)] = (str(job_id).encode("utf-8"), id_to_text_hash.get(key, "").encode("ascii"))
+        return cls(table)
+
+    def job_id(self, internal_id: int) -> Optional[str]:
+        if internal_id < 0 or internal_id >= len(self._table):
+            return None
+        raw = self._table["job_id"][internal_id]
+        return raw.decode("utf-8") if raw else None
+
+    def text_hash(self, internal_id: int) -> Optional[str]:
+        if internal_id < 0 or internal_id >= len(self._table):
+            return None
+        raw = self._table["text_hash"][internal_id]
+        return raw.decode("ascii") if raw else None
+
+    def entries(self) -> Iterator[Tuple[int, str, str]]:
+        """(internal id, job id, text hash) for every used row."""
+        used = np.flatnonzero(self._table["job_id"] != b"")
+        for iid in used.tolist():
+            row = self._table[iid]
+            yield iid, row["job_id"].decode("utf-8"), row["text_hash"].decode("ascii")
+
+    @property
+    def num_rows(self) -> int:
+        return len(self._table)
+
+    def __getitem__(self, key: str) -> str:
+        try:
+            value = self.job_id(int(key))
+        except (TypeError, ValueError):
+            value = None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        for iid, _job_id, _h in self.entries():
+            yield str(iid)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._table["job_id"] != b""))
+
+
+def load_id_map(prefix: str, meta: Dict[str, Any], mmap: bool = True) -> IdMap:
+    """Open the sidecar (memory-mapped by default), falling back to the dicts in older metadata."""
+    path = id_map_path(prefix)
+    if os.path.exists(path):
+        try:
+            return IdMap(np.load(path, mmap_mode="r" if mmap else None))
+        except ValueError:
+            # numpy refuses to map a zero-length array
+            return IdMap(np.load(path))
+    return IdMap.from_dicts(meta.get("id_to_job_id", {}), meta.get("id_to_text_hash"))
+
+
+__all__ = [
+    "id_map_path",
+    "write_id_map",
+    "IdMap",
+    "load_id_map",
+]
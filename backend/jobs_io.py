@@ -0,0 +1,118 @@
+import os
+import json
+from typing import Any, Dict, Iterable, Iterator, Set, TextIO
+
+
+JSONL_EXTENSIONS = {".jsonl", ".ndjson"}
+_READ_CHUNK = 1 << 16
+_WHITESPACE = " \t\r\n"
+
+
+def _iter_json_array(f: TextIO, chunk_size: int = _READ_CHUNK) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def _fill() -> bool:
+        nonlocal buf, eof
+        more = f.read(chunk_size)
+        if not more:
+            eof = True
+            return False
+        buf += more
+        return True
+
+    def _skip_ws() -> bool:
+        # Advance past whitespace; False once the input is exhausted
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf):
+                return True
+            if eof or not _fill():
+                return False
+
+    if not _skip_ws() or buf[pos] != "[":
+        raise ValueError("Expected jobs JSON to be a list of job objects")
+    pos += 1
+    while True:
+        if not _skip_ws():
+            raise ValueError("Unexpected end of jobs JSON (unterminated list)")
+        ch = buf[pos]
+        if ch == "]":
+            return
+        if ch == ",":
+            pos += 1
+            continue
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof or not _fill():
+                raise
+            continue
+        if end >= len(buf) and not eof:
+            # A scalar may have been cut at the buffer edge; re-decode with more input
+            if _fill():
+                continue
+        yield obj
+        buf = buf[end:]
+        pos = 0
+
+
+def is_jsonl_path(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in JSONL_EXTENSIONS
+
+
+def iter_jobs(jobs_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream job objects one at a time from either the scraper's JSON array file
+    or a JSON Lines file (one job per line, by .jsonl/.ndjson extension).
+    """
+    if not os.path.exists(jobs_path):
+        raise FileNotFoundError(f"Jobs JSON not found at: {jobs_path}")
+    with open(jobs_path, "r", encoding="utf-8") as f:
+        if is_jsonl_path(jobs_path):
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(f)
+
+
+def find_jobs(jobs_path: str, job_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Return {job id: job} for the requested ids, keeping only those jobs in memory."""
+    wanted: Set[str] = {str(j) for j in job_ids}
+    found: Dict[str, Dict[str, Any]] = {}
+    for job in iter_jobs(jobs_path):
+        jid = str(job.get("id"))
+        if jid in wanted:
+            # Later entries win, matching a dict built over the whole file
+            found[jid] = job
+    return found
+
+
+def write_jobs_jsonl(jobs: Iterable[Dict[str, Any]], path: str) -> int:
+    """Write jobs as JSON Lines; returns the number written."""
+    dirpath = os.path.dirname(os.path.abspath(path))
+    if dirpath:
+        os.makedirs(dirpath, exist_ok=True)
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for job in jobs:
+            f.write(json.dumps(job, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+
+__all__ = [
+    "JSONL_EXTENSIONS",
+    "is_jsonl_path",
+    "iter_jobs",
+    "find_jobs",
+    "write_jobs_jsonl",
+]
@@ -0,0 +1,165 @@
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.array_store import load_arrays, load_legacy_npz, remove_legacy_npz, write_arrays
+
+
+# Keeps tokens like "c++", "c#", "node.js" and "k8s" intact
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60
+BM25_ARRAYS = ("vocab", "idf", "indptr", "docs", "weights", "num_rows")
+
+
+def bm25_path(prefix: str) -> str:
+    """Stem of the BM25 sidecar; each array is stored as `{stem}.{name}.npy`."""
+    return f"{prefix}.bm25"
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+class BM25Builder:
+    """
+    Accumulates (internal id, text) pairs and produces a BM25 inverted index in
+    CSR form: postings for term t are docs[indptr[t]:indptr[t+1]] with the full
+    BM25 weight (IDF and length normalisation folded in) precomputed per posting,
+    so a query is just a gather + bincount over its terms' postings.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._vocab: Dict[str, int] = {}
+        self._terms: List[np.ndarray] = []
+        self._docs: List[np.ndarray] = []
+        self._tfs: List[np.ndarray] = []
+        self._lengths: Dict[int, int] = {}
+
+    def add(self, internal_id: int, text: str) -> None:
+        counts = Counter(tokenize(text))
+        self._lengths[internal_id] = sum(counts.values())
+        if not counts:
+            return
+        term_ids = [self._vocab.setdefault(t, len(self._vocab)) for t in counts]
+        self._terms.append(np.asarray(term_ids, dtype="int32"))
+        self._docs.append(np.full(len(term_ids), internal_id, dtype="int32"))
+        self._tfs.append(np.asarray(list(counts.values()), dtype="float32"))
+
+    def finish(self, num_rows: int) -> Dict[str, np.ndarray]:
+        # Vocabulary is stored sorted so queries can look terms up with searchsorted
+        vocab = sorted(self._vocab)
+        rank = np.empty(len(vocab), dtype="int32")
+        for new_id, term in enumerate(vocab):
+            rank[self._vocab[term]] = new_id
+        terms = rank[np.concatenate(self._terms)] if self._terms else np.zeros(0, dtype="int32")
+        docs = np.concatenate(self._docs) if self._docs else np.zeros(0, dtype="int32")
+        tfs = np.concatenate(self._tfs) if self._tfs else np.zeros(0, dtype="float32")
+
+        doc_len = np.zeros(num_rows, dtype="float32")
+        for iid, length in self._lengths.items():
+            doc_len[iid] = length
+        num_docs = max(len(self._lengths), 1)
+        avgdl = float(doc_len.sum()) / num_docs or 1.0
+
+        df = np.bincount(terms, minlength=len(vocab))
+        idf = np.log1p((num_docs - df + 0.5) / (df + 0.5)).astype("float32")
+        norm = self.k1 * (1.0 - self.b + self.b * doc_len[docs] / avgdl)
+        weights = idf[terms] * tfs * (self.k1 + 1.0) / (tfs + norm)
+
+        order = np.lexsort((docs, terms))
+        indptr = np.zeros(len(vocab) + 1, dtype="int64")
+        np.cumsum(df, out=indptr[1:])
+        return {
+            "vocab": np.asarray(vocab, dtype=str),
+            "idf": idf,
+            "indptr": indptr,
+            "docs": docs[order],
+            "weights": weights[order].astype("float32"),
+            "num_rows": np.asarray(num_rows, dtype="int64"),
+        }
+
+
+def write_bm25(prefix: str, arrays: Dict[str, np.ndarray]) -> str:
+    stem = bm25_path(prefix)
+    write_arrays(stem, {name: arrays[name] for name in BM25_ARRAYS})
+    remove_legacy_npz(f"{stem}.npz")
+    return stem
+
+
+class BM25Index:
+    """Read side of the BM25 sidecar; scores are per internal id (row of the id map)."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.vocab = arrays["vocab"]
+        self.idf = arrays["idf"]
+        self.indptr = arrays["indptr"]
+        self.docs = arrays["docs"]
+        self.weights = arrays["weights"]
+        self.num_rows = int(arrays["num_rows"])
+
+    def _term_ids(self, tokens: Iterable[str]) -> np.ndarray:
+        terms = np.asarray(sorted(set(tokens)), dtype=str)
+        if not len(terms) or not len(self.vocab):
+            return np.zeros(0, dtype="int64")
+        pos = np.searchsorted(self.vocab, terms)
+        pos = np.minimum(pos, len(self.vocab) - 1)
+        return pos[self.vocab[pos] == terms]
+
+    def scores(self, text: str) -> np.ndarray:
+        """BM25 score of every row for `text` (each distinct query term counted once)."""
+        term_ids = self._term_ids(tokenize(text))
+        if not len(term_ids):
+            return np.zeros(self.num_rows, dtype="float32")
+        starts = self.indptr[term_ids]
+        ends = self.indptr[term_ids + 1]
+        idx = np.concatenate([np.arange(s, e) for s, e in zip(starts.tolist(), ends.tolist())])
+        return np.bincount(self.docs[idx], weights=self.weights[idx], minlength=self.num_rows).astype("float32")
+
+    def search(self, text: str, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k (scores, internal ids) for `text`; rows with no matching term are left out."""
+        scores = self.scores(text)
+        hits = top_rows(scores, top_k)
+        return scores[hits], hits
+
+
+def top_rows(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Indices of the `top_k` highest positive scores, best first."""
+    hits = np.flatnonzero(scores > 0)
+    if len(hits) > top_k:
+        hits = hits[np.argpartition(-scores[hits], top_k - 1)[:top_k]]
+    return hits[np.argsort(-scores[hits], kind="stable")]
+
+
+def load_bm25(prefix: str, mmap: bool = True) -> Optional[BM25Index]:
+    """The BM25 sidecar (postings memory-mapped read-only by default), or None if absent."""
+    stem = bm25_path(prefix)
+    arrays = load_arrays(stem, BM25_ARRAYS, mmap=mmap) or load_legacy_npz(f"{stem}.npz")
+    return BM25Index(arrays) if arrays is not None else None
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = RRF_K) -> List[Tuple[int, float]]:
+    """Fuse ranked id lists: score(id) = sum over lists of 1 / (k + rank). Highest first."""
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            fused[item] = fused.get(item, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused.items(), key=lambda kv: -kv[1])
+
+
+__all__ = [
+    "BM25_ARRAYS",
+    "bm25_path",
+    "tokenize",
+    "BM25Builder",
+    "write_bm25",
+    "BM25Index",
+    "top_rows",
+    "load_bm25",
+    "reciprocal_rank_fusion",
+]
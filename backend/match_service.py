@@ -0,0 +1,205 @@
+import os
+import json
+import time
+import argparse
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.env import env_flag
+
+
+DEFAULT_PORT = 8765
+# Connection refused comes back immediately; this only bounds a hung service
+CLIENT_TIMEOUT_S = float(os.environ.get("WAT_MATCH_SERVICE_TIMEOUT", "120"))
+# match_resume_to_jobs keyword arguments forwarded to the service as-is
+_FORWARDED = (
+    "top_k",
+    "model_name",
+    "backend",
+    "hybrid",
+    "filters",
+    "rerank_model",
+    "rerank_budget_ms",
+    "section_mode",
+)
+
+
+def service_url(port: Optional[int] = None) -> str:
+    return os.environ.get("WAT_MATCH_SERVICE_URL") or f"http://127.0.0.1:{port or DEFAULT_PORT}"
+
+
+def _service_enabled() -> bool:
+    return env_flag("WAT_MATCH_SERVICE")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "WatMatch/1"
+
+    def _reply(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            self._reply(404, {"error": f"unknown path {self.path}"})
+            return
+        from backend.matcher import _RESIDENT
+        self._reply(200, {"status": "ok", "pid": os.getpid(), "indexes": sorted(_RESIDENT)})
+
+    def do_POST(self) -> None:
+        if self.path != "/match":
+            self._reply(404, {"error": f"unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            queries = [(q[0], q[1]) for q in request["queries"]]
+            kwargs = {k: request[k] for k in _FORWARDED if request.get(k) is not None}
+        except (KeyError, TypeError, IndexError, ValueError) as e:
+            self._reply(400, {"error": f"bad request: {e}"})
+            return
+        from backend.matcher import match_many
+        start = time.perf_counter()
+        try:
+            results = match_many(queries, request["index_prefix"], **kwargs)
+        except Exception as e:
+            self._reply(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self._reply(200, {"results": results, "elapsed_ms": round((time.perf_counter() - start) * 1000.0, 2)})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if os.environ.get("WAT_MATCH_SERVICE_LOG"):
+            super().log_message(format, *args)
+
+
+def serve(
+    port: Optional[int] = None,
+    index_prefix: Optional[str] = None,
+    model_name: Optional[str] = None,
+    backend: Optional[str] = None,
+) -> None:
+    """
+    Run the match service on 127.0.0.1 until interrupted. Requests are handled by
+    match_many on worker threads, so the embedding model (model_registry) and
+    loaded indexes (matcher.resident_index) stay in memory between requests; an
+    index rebuilt by vectorize_jobs is picked up on the next request for it.
+    `index_prefix` / `model_name` are loaded up front so the first request is fast.
+    """
+    from backend.matcher import resident_index
+    from backend.model_registry import warmup
+
+    if model_name:
+        warmup([model_name], backend=backend, background=False)
+    if index_prefix:
+        try:
+            resident_index(index_prefix)
+        except FileNotFoundError as e:
+            print(f"Warning: {e}; it will be loaded on first request")
+    server = ThreadingHTTPServer(("127.0.0.1", port or DEFAULT_PORT), _Handler)
+    server.daemon_threads = True
+    print(f"Match service listening on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def match_remote(
+    queries: List[Tuple[str, Optional[str]]],
+    index_prefix: str,
+    url: Optional[str] = None,
+    **kwargs: Any,
+) -> Optional[List[List[Dict[str, Any]]]]:
+    """
+    match_many through a running service, or None when none is reachable. Paths
+    are sent absolute since the service may run from another directory.
+    """
+    payload = {
+        "queries": [(os.path.abspath(r), os.path.abspath(c) if c else None) for r, c in queries],
+        "index_prefix": os.path.abspath(index_prefix),
+    }
+    payload.update({k: v for k, v in kwargs.items() if k in _FORWARDED and v is not None})
+    req = urllib.request.Request(
+        f"{(url or service_url()).rstrip('/')}/match",
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=CLIENT_TIMEOUT_S) as resp:
+            return json.loads(resp.read())["results"]
+    except urllib.error.HTTPError as e:
+        try:
+            detail = json.loads(e.read()).get("error")
+        except ValueError:
+            detail = e.reason
+        print(f"Warning: match service error ({detail}); matching in-process")
+        return None
+    except (urllib.error.URLError, OSError, ValueError, KeyError):
+        return None
+
+
+def match_resume_to_jobs(
+    resume_path: str,
+    index_prefix: str,
+    constraints_path: Optional[str] = None,
+    service_port: Optional[int] = None,
+    **kwargs: Any,
+) -> List[Dict[str, Any]]:
+    """
+    backend.matcher.match_resume_to_jobs, answered by the match service when one
+    is running (WAT_MATCH_SERVICE_URL or 127.0.0.1:`service_port`) and in-process
+    otherwise. WAT_MATCH_SERVICE=0 skips the service.
+    """
+    if _service_enabled():
+        results = match_remote([(resume_path, constraints_path)], index_prefix, service_url(service_port), **kwargs)
+        if results is not None:
+            return results[0]
+    from backend.matcher import match_resume_to_jobs as match_local
+    return match_local(resume_path=resume_path, index_prefix=index_prefix, constraints_path=constraints_path, **kwargs)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="backend.match_service", description="Serve resume matching from a resident model and index")
+    parser.add_argument("--config", "-c", default=None, help="config.yaml to take the port, index and model from")
+    parser.add_argument("--port", "-p", type=int, default=None)
+    parser.add_argument("--index-prefix", "-i", default=None, help="Index to load at start-up")
+    parser.add_argument("--model", "-m", default=None, help="Embedding model to load at start-up")
+    args = parser.parse_args(argv)
+
+    cfg: Dict[str, Any] = {}
+    config_path = args.config or os.path.join(os.path.dirname(__file__), "..", "config", "config.yaml")
+    if os.path.exists(config_path):
+        import yaml
+        with open(config_path, "r", encoding="utf-8") as f:
+            cfg = yaml.safe_load(f) or {}
+    base_dir = os.path.abspath(os.path.join(os.path.dirname(config_path), ".."))
+    index_prefix = args.index_prefix or (os.path.join(base_dir, cfg["index_prefix"]) if cfg.get("index_prefix") else None)
+    serve(
+        port=args.port or cfg.get("match_service_port"),
+        index_prefix=index_prefix,
+        model_name=args.model or cfg.get("embed_model"),
+        backend=cfg.get("embed_backend"),
+    )
+    return 0
+
+
+__all__ = [
+    "DEFAULT_PORT",
+    "service_url",
+    "serve",
+    "match_remote",
+    "match_resume_to_jobs",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,106 +1,701 @@
 import os
 import json
-from typing import List, Dict, Any, Tuple
+import threading
+from typing import Callable, List, Dict, Any, Optional, Sequence, Tuple
 
 import numpy as np
 import faiss  # type: ignore
 
-
-def read_file_text(path: str) -> str:
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"File not found: {path}")
-    # Basic extractor for .tex or .txt; if PDF is needed, we can extend
-    _, ext = os.path.splitext(path)
-    if ext.lower() in {".tex", ".txt", ".md"}:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            return f.read()
-    elif ext.lower() == ".pdf":
-        try:
-            import fitz  # PyMuPDF
-        except Exception as e:
-            raise RuntimeError("PyMuPDF is required to read PDFs. Install PyMuPDF or provide a .tex/.txt resume.") from e
-        doc = fitz.open(path)
-        return "".join(page.get_text() for page in doc)
-    else:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            return f.read()
+from backend.env import env_flag
+from backend.id_map import load_id_map
+from backend.embedding_store import load_embeddings
+from backend.filters import has_filters, id_selector, load_attributes
+from backend.lexical import load_bm25, reciprocal_rank_fusion, top_rows
+from backend.model_registry import get_model, resolve_backend
+from backend.query_cache import cache_enabled, lookup_many, put_vector, query_key
+from backend.reranker import DEFAULT_RERANK_DEPTH, rerank
+from backend.textextract import extract_many, extract_sections, extract_text, read_file_text
 
 
-def build_query_embedding(text: str, model_name: str) -> np.ndarray:
-    from sentence_transformers import SentenceTransformer
-    model = SentenceTransformer(model_name)
-    emb = model.encode([text], convert_to_numpy=True)
+def _normalize_rows(emb: np.ndarray) -> np.ndarray:
     # Normalize for cosine via inner product
     norm = np.linalg.norm(emb, axis=1, keepdims=True)
     norm[norm == 0] = 1.0
-    emb = emb / norm
-    return emb.astype("float32")
+    return (emb / norm).astype("float32")
+
+
+def build_query_embeddings(
+    texts: Sequence[str],
+    model_name: str,
+    device: Optional[str] = None,
+    backend: Optional[str] = None,
+) -> np.ndarray:
+    """
+    Embed many query texts in one encode call; rows are unit-normalized. Vectors
+    are cached in memory and on disk by (normalized text hash, model, backend),
+    so only texts not seen before reach the encoder (WAT_MATCH_QUERY_CACHE=0 disables).
+    """
+    texts = list(texts)
+    if not cache_enabled():
+        model = get_model(model_name, device, backend)
+        return _normalize_rows(model.encode(texts, convert_to_numpy=True))
+    backend = resolve_backend(backend)
+    keys = [query_key(t, model_name, backend) for t in texts]
+    found = lookup_many(keys)
+    missing = [i for i, key in enumerate(keys) if key not in found]
+    if missing:
+        model = get_model(model_name, device, backend)
+        emb = _normalize_rows(model.encode([texts[i] for i in missing], convert_to_numpy=True))
+        for row, i in enumerate(missing):
+            found[keys[i]] = emb[row]
+            put_vector(keys[i], emb[row])
+    return np.stack([found[key] for key in keys]).astype("float32") if keys else np.zeros((0, 0), dtype="float32")
+
+
+def build_query_embedding(
+    text: str,
+    model_name: str,
+    device: Optional[str] = None,
+    backend: Optional[str] = None,
+) -> np.ndarray:
+    return build_query_embeddings([text], model_name, device, backend)
 
 
-def load_index(prefix: str) -> Tuple[faiss.Index, Dict[str, Any]]:
+# Minimum per-retriever candidate depth for rank fusion
+FUSION_MIN_DEPTH = 50
+# Dense candidates handed to a rescore hook
+RESCORE_DEPTH = 100
+# (query_vec, cand_vecs, cand_ids, scores) -> new scores, all row-aligned
+RescoreFn = Callable[[np.ndarray, np.ndarray, np.ndarray, np.ndarray], np.ndarray]
+
+
+def _mmap_enabled(mmap: Optional[bool]) -> bool:
+    if mmap is not None:
+        return mmap
+    return env_flag("WAT_MATCH_INDEX_MMAP")
+
+
+def _mmap_flags(meta: Dict[str, Any]) -> int:
+    # IO_FLAG_MMAP only maps IVF inverted lists; flat/HNSW/SQ indexes keep their
+    # vectors in flat code storage, which needs IO_FLAG_MMAP_IFC (the two can't be combined)
+    index_type = (meta.get("index") or {}).get("type", "flat")
+    family_flag = faiss.IO_FLAG_MMAP if index_type in ("ivf_flat", "ivf_pq") else faiss.IO_FLAG_MMAP_IFC
+    return family_flag | faiss.IO_FLAG_READ_ONLY
+
+
+def load_index(prefix: str, mmap: Optional[bool] = None) -> Tuple[faiss.Index, Dict[str, Any]]:
+    """
+    Load the FAISS index and metadata for `prefix`. By default the index's vectors
+    are memory-mapped read-only with the flag for its family (falling back to a
+    full read where FAISS can't map it) and meta["id_to_job_id"] is an IdMap over
+    the memory-mapped sidecar, so startup cost and per-process RSS stay flat as
+    the corpus grows.
+    """
     index_path = f"{prefix}.faiss"
     meta_path = f"{prefix}.meta.json"
     if not os.path.exists(index_path) or not os.path.exists(meta_path):
         raise FileNotFoundError(f"Index or metadata not found for prefix: {prefix}")
-    index = faiss.read_index(index_path)
     with open(meta_path, "r", encoding="utf-8") as f:
         meta = json.load(f)
+    use_mmap = _mmap_enabled(mmap)
+    index = None
+    if use_mmap:
+        try:
+            index = faiss.read_index(index_path, _mmap_flags(meta))
+        except RuntimeError:
+            index = None
+    if index is None:
+        index = faiss.read_index(index_path)
+    meta["id_to_job_id"] = load_id_map(prefix, meta, mmap=use_mmap)
+    meta.pop("id_to_text_hash", None)
+    apply_search_params(index, meta)
     return index, meta
 
 
+class ResidentIndex:
+    """
+    An index loaded for reuse across match calls: the FAISS index and metadata,
+    plus the BM25, embedding and attribute sidecars loaded on first use.
+    """
+
+    def __init__(self, prefix: str, signature: Tuple[Tuple[int, int, int], ...]):
+        self.prefix = prefix
+        self.signature = signature
+        self.index, self.meta = load_index(prefix)
+        self._sidecars: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _sidecar(self, name: str, loader: Callable[[str], Any]) -> Any:
+        with self._lock:
+            if name not in self._sidecars:
+                self._sidecars[name] = loader(self.prefix)
+            return self._sidecars[name]
+
+    def bm25(self) -> Any:
+        return self._sidecar("bm25", load_bm25)
+
+    def embeddings(self) -> Optional[np.ndarray]:
+        return self._sidecar("embeddings", load_embeddings)
+
+    def attributes(self) -> Any:
+        return self._sidecar("attributes", load_attributes)
+
+
+# prefix -> loaded index; replaced when the index files change on disk
+_RESIDENT: Dict[str, ResidentIndex] = {}
+_RESIDENT_LOCK = threading.Lock()
+
+
+def _index_signature(prefix: str) -> Tuple[Tuple[int, int, int], ...]:
+    sig = []
+    for path in (f"{prefix}.faiss", f"{prefix}.meta.json"):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Index or metadata not found for prefix: {prefix}") from None
+        sig.append((st.st_mtime_ns, st.st_size, st.st_ino))
+    return tuple(sig)
+
+
+def resident_index(prefix: str) -> ResidentIndex:
+    """
+    The process-wide loaded index for `prefix`. vectorize_jobs replaces the
+    .faiss/.meta.json files (after its sidecars), so a changed stat signature
+    means a rebuild and the index is reloaded; otherwise repeat calls reuse it.
+    """
+    prefix = os.path.abspath(prefix)
+    signature = _index_signature(prefix)
+    with _RESIDENT_LOCK:
+        current = _RESIDENT.get(prefix)
+        if current is not None and current.signature == signature:
+            return current
+        current = ResidentIndex(prefix, signature)
+        _RESIDENT[prefix] = current
+    return current
+
+
+def clear_resident_indexes() -> None:
+    with _RESIDENT_LOCK:
+        _RESIDENT.clear()
+
+
+def _search_knobs(meta: Dict[str, Any]) -> Dict[str, int]:
+    # Search-time knobs recorded by the vectorizer, with env overrides
+    info = meta.get("index") or {}
+    index_type = info.get("type", "flat")
+    knobs: Dict[str, int] = {}
+    if index_type in ("ivf_flat", "ivf_pq"):
+        nprobe = os.environ.get("WAT_MATCH_NPROBE") or info.get("nprobe")
+        if nprobe:
+            knobs["nprobe"] = int(nprobe)
+    elif index_type == "hnsw":
+        ef_search = os.environ.get("WAT_MATCH_EF_SEARCH") or info.get("ef_search")
+        if ef_search:
+            knobs["efSearch"] = int(ef_search)
+    return knobs
+
+
+def apply_search_params(index: faiss.Index, meta: Dict[str, Any]) -> None:
+    """
+    Set search-time knobs recorded by the vectorizer (nprobe for IVF, efSearch for
+    HNSW). WAT_MATCH_NPROBE / WAT_MATCH_EF_SEARCH override the stored values.
+    """
+    ps = faiss.ParameterSpace()
+    for name, value in _search_knobs(meta).items():
+        ps.set_index_parameter(index, name, value)
+
+
+def filtered_search_params(meta: Dict[str, Any], selector: faiss.IDSelector) -> faiss.SearchParameters:
+    """
+    SearchParameters restricting a search to `selector`. Per-call parameters
+    replace the index's own settings, so the nprobe/efSearch knobs are repeated here.
+    """
+    knobs = _search_knobs(meta)
+    if "nprobe" in knobs:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=knobs["nprobe"])
+    if "efSearch" in knobs:
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=knobs["efSearch"])
+    return faiss.SearchParameters(sel=selector)
+
+
 def search(index: faiss.Index, query_vec: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
     distances, ids = index.search(query_vec, top_k)
     return distances[0], ids[0]
 
 
+def search_batch(
+    index: faiss.Index,
+    query_vecs: np.ndarray,
+    top_k: int,
+    params: Optional[faiss.SearchParameters] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """One matrix search for all query rows; returns (scores, internal ids), one row per query."""
+    return index.search(np.ascontiguousarray(query_vecs, dtype="float32"), top_k, params=params)
+
+
+def _constraint_weight() -> float:
+    try:
+        weight = float(os.getenv("WAT_MATCH_CONSTRAINT_WEIGHT", "0.2"))
+    except Exception:
+        weight = 0.2
+    return max(0.0, min(1.0, weight))
+
+
+def _read_constraints(path: Optional[str]) -> str:
+    if not path:
+        return ""
+    try:
+        return extract_text(path)
+    except FileNotFoundError:
+        return ""
+
+
+def _to_results(scores: np.ndarray, ids: np.ndarray, id_map: Any) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    for score, internal_id in zip(scores.tolist(), ids.tolist()):
+        if internal_id == -1:
+            continue
+        job_id = id_map.job_id(internal_id) or str(internal_id)
+        results.append({"job_id": job_id, "score": float(score), "_internal_id": internal_id})
+    return results
+
+
+def _hybrid_enabled(hybrid: Optional[bool]) -> bool:
+    if hybrid is not None:
+        return hybrid
+    return env_flag("WAT_MATCH_HYBRID")
+
+
+def exact_rescore(query_vec: np.ndarray, cand_vecs: np.ndarray, cand_ids: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    """Rescore hook: exact float32 cosine, undoing any quantization error in the index scores."""
+    return cand_vecs @ query_vec
+
+
+def rescore_candidates(
+    query_vecs: np.ndarray,
+    scores: np.ndarray,
+    ids: np.ndarray,
+    embeddings: np.ndarray,
+    rescore: RescoreFn,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Re-score each query's candidates with `rescore(query_vec, cand_vecs, cand_ids,
+    scores) -> new scores` over rows of the stored embedding matrix, then re-sort.
+    Padding (-1) stays at the end of each row.
+    """
+    out_scores = np.full(scores.shape, -np.inf, dtype="float32")
+    out_ids = np.full(ids.shape, -1, dtype="int64")
+    for i in range(len(ids)):
+        valid = ids[i] != -1
+        cand_ids = ids[i][valid]
+        if not len(cand_ids):
+            continue
+        cand_vecs = np.asarray(embeddings[cand_ids], dtype="float32")
+        new = np.asarray(rescore(query_vecs[i], cand_vecs, cand_ids, scores[i][valid]), dtype="float32")
+        order = np.argsort(-new, kind="stable")
+        out_scores[i, : len(order)] = new[order]
+        out_ids[i, : len(order)] = cand_ids[order]
+    return out_scores, out_ids
+
+
+def _fuse_results(
+    dense_scores: np.ndarray,
+    dense_ids: np.ndarray,
+    bm25_scores: np.ndarray,
+    top_k: int,
+    depth: int,
+    id_map: Any,
+    keyword_dense_score: Optional[Callable[[int], Optional[float]]] = None,
+) -> List[Dict[str, Any]]:
+    # Reciprocal rank fusion of the dense and BM25 candidate lists
+    dense_rank = [i for i in dense_ids.tolist() if i != -1]
+    dense_by_id = {i: float(s) for s, i in zip(dense_scores.tolist(), dense_ids.tolist()) if i != -1}
+    lexical_rank = top_rows(bm25_scores, depth).tolist()
+    results: List[Dict[str, Any]] = []
+    for internal_id, fused in reciprocal_rank_fusion([dense_rank, lexical_rank])[:top_k]:
+        dense_score = dense_by_id.get(internal_id)
+        if dense_score is None and keyword_dense_score is not None:
+            # Keyword-only hit: scored the same way as the dense candidates
+            dense_score = keyword_dense_score(internal_id)
+        results.append({
+            "job_id": id_map.job_id(internal_id) or str(internal_id),
+            "score": fused,
+            # None only when the posting was retrieved by keywords and no embedding matrix exists
+            "dense_score": dense_score,
+            "bm25_score": float(bm25_scores[internal_id]) if internal_id < len(bm25_scores) else 0.0,
+            "_internal_id": internal_id,
+        })
+    return results
+
+
+def _keyword_dense_scorer(
+    embeddings: Optional[np.ndarray],
+    query_vecs: np.ndarray,
+    weights: Optional[np.ndarray] = None,
+    mode: str = "max",
+    titles: Optional[List[str]] = None,
+    contributions: Optional[Dict[int, Dict[str, float]]] = None,
+) -> Optional[Callable[[int], Optional[float]]]:
+    """
+    Dense score for a job the dense search didn't return: its dot product with the
+    query vector, or with each of `query_vecs` (one per resume section) combined by
+    combine_section_scores, recording the per-section scores in `contributions`.
+    """
+    if embeddings is None:
+        return None
+    vecs = np.atleast_2d(query_vecs)
+
+    def score(internal_id: int) -> Optional[float]:
+        if internal_id >= len(embeddings):
+            return None
+        per_section = np.asarray(embeddings[internal_id], dtype="float32") @ vecs.T
+        if weights is None:
+            return float(per_section[0])
+        if contributions is not None and titles is not None:
+            contributions[internal_id] = {t: float(v) for t, v in zip(titles, per_section.tolist())}
+        return float(combine_section_scores(per_section[None, :], weights, mode)[0])
+
+    return score
+
+
+SECTION_MODES = ("off", "max", "weighted")
+# Weight of a resume section in "weighted" aggregation, by keyword in its title
+SECTION_WEIGHTS = {"experience": 1.0, "project": 1.0, "highlight": 1.0, "skill": 0.8, "education": 0.5}
+# Untitled text before the first section is usually the name/contact block
+HEADER_WEIGHT = 0.25
+MIN_SECTION_WORDS = 5
+
+
+def _resolve_section_mode(mode: Optional[str]) -> str:
+    mode = mode or os.environ.get("WAT_MATCH_SECTION_MODE") or "off"
+    if mode not in SECTION_MODES:
+        raise ValueError(f"Unknown section mode: {mode} (expected one of {', '.join(SECTION_MODES)})")
+    return mode
+
+
+def section_weight(title: str) -> float:
+    if not title:
+        return HEADER_WEIGHT
+    lowered = title.lower()
+    for keyword, weight in SECTION_WEIGHTS.items():
+        if keyword in lowered:
+            return weight
+    return 1.0
+
+
+def resume_sections(path: str, full_text: str) -> List[Tuple[str, str]]:
+    """(title, text to embed) per resume section; falls back to the whole resume."""
+    sections = [
+        (title, f"{title}\n{body}" if title else body)
+        for title, body in extract_sections(path)
+        if len(body.split()) >= MIN_SECTION_WORDS
+    ]
+    return sections or [("", full_text)]
+
+
+def _section_titles(section_rows: Sequence[Tuple[int, str, str]], rows: Sequence[int]) -> List[str]:
+    return [section_rows[r][1] or "header" for r in rows]
+
+
+def _section_weight_vector(section_rows: Sequence[Tuple[int, str, str]], rows: Sequence[int]) -> np.ndarray:
+    return np.asarray([section_weight(section_rows[r][1]) for r in rows], dtype="float32")
+
+
+def combine_section_scores(per_section: np.ndarray, weights: np.ndarray, mode: str) -> np.ndarray:
+    """(candidates, sections) scores -> one score per candidate, by max or weighted mean."""
+    if mode == "max":
+        return per_section.max(axis=1)
+    return per_section @ weights / max(float(weights.sum()), 1e-6)
+
+
+def aggregate_sections(
+    section_rows: Sequence[Tuple[int, str, str]],
+    section_vecs: np.ndarray,
+    section_scores: np.ndarray,
+    section_ids: np.ndarray,
+    num_queries: int,
+    depth: int,
+    mode: str,
+    embeddings: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray, List[Dict[int, Dict[str, float]]]]:
+    """
+    Merge per-section search results into one ranked (scores, ids) row per query.
+    Each candidate retrieved by any section is scored against every section of
+    its query — exactly via the embedding matrix when available, otherwise from
+    the search results (0 for sections that didn't retrieve it) — and those
+    scores are combined by max or weighted mean. Also returns, per query,
+    {internal id: {section title: score}} for the kept candidates.
+    """
+    scores = np.full((num_queries, depth), -np.inf, dtype="float32")
+    ids = np.full((num_queries, depth), -1, dtype="int64")
+    contributions: List[Dict[int, Dict[str, float]]] = [{} for _ in range(num_queries)]
+    by_query: Dict[int, List[int]] = {}
+    for row, (qi, _title, _text) in enumerate(section_rows):
+        by_query.setdefault(qi, []).append(row)
+
+    for qi, rows in by_query.items():
+        found = section_ids[rows]
+        union = np.unique(found[found != -1])
+        if not len(union):
+            continue
+        if embeddings is not None:
+            per_section = np.asarray(embeddings[union], dtype="float32") @ section_vecs[rows].T
+        else:
+            per_section = np.zeros((len(union), len(rows)), dtype="float32")
+            pos = {iid: k for k, iid in enumerate(union.tolist())}
+            for col, row in enumerate(rows):
+                for score, iid in zip(section_scores[row].tolist(), section_ids[row].tolist()):
+                    if iid != -1:
+                        per_section[pos[iid], col] = score
+        combined = combine_section_scores(per_section, _section_weight_vector(section_rows, rows), mode)
+        order = np.argsort(-combined, kind="stable")[:depth]
+        scores[qi, : len(order)] = combined[order]
+        ids[qi, : len(order)] = union[order]
+        titles = _section_titles(section_rows, rows)
+        for k in order.tolist():
+            contributions[qi][int(union[k])] = {t: float(v) for t, v in zip(titles, per_section[k].tolist())}
+    return scores, ids, contributions
+
+
+def match_many(
+    queries: Sequence[Tuple[str, Optional[str]]],
+    index_prefix: str,
+    top_k: int = 10,
+    model_name: str = os.environ.get("WAT_MATCH_EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2"),
+    backend: Optional[str] = None,
+    hybrid: Optional[bool] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    rescore: Optional[RescoreFn] = None,
+    rescore_depth: int = RESCORE_DEPTH,
+    rerank_model: Optional[str] = None,
+    rerank_depth: int = DEFAULT_RERANK_DEPTH,
+    rerank_budget_ms: Optional[float] = None,
+    section_mode: Optional[str] = None,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Match many (resume path, constraints path or None) pairs against one index.
+    The index is loaded once, every distinct resume/constraints text is embedded
+    in a single encode call, and all blended queries go through one matrix search.
+    Returns one ranked [{job_id, score}] list per pair, in input order.
+
+    With `hybrid` (default; WAT_MATCH_HYBRID=0 turns it off) and a BM25 sidecar
+    present, each query also runs a keyword search over the same job text and
+    the two candidate lists are merged by reciprocal rank fusion; `score` is then
+    the fused score and results also carry `dense_score` and `bm25_score`.
+
+    `filters` (see backend.filters.AttributeIndex, e.g. {"cities": ["toronto"],
+    "min_hourly_pay": 25}) restricts both searches to matching postings. It is
+    applied inside the FAISS search as an ID selector, so up to `top_k` results
+    come back as long as enough postings pass.
+
+    `rescore` is an experiment hook: the top `rescore_depth` dense candidates of
+    each query are re-scored by `rescore(query_vec, cand_vecs, cand_ids, scores)`
+    over the stored embedding matrix (see rescore_candidates, exact_rescore), so
+    a scoring tweak costs a matrix multiply rather than an encode.
+
+    `rerank_model` (a sentence-transformers CrossEncoder name; WAT_MATCH_RERANK_MODEL)
+    enables a second stage: the leading first-stage candidates, up to
+    `rerank_depth` and capped by `rerank_budget_ms` per query, are scored as
+    (resume, job) pairs in one batched call and move to the front ordered by
+    `rerank_score` (see backend.reranker).
+
+    `section_mode` ("off", "max", "weighted"; WAT_MATCH_SECTION_MODE) queries with
+    one vector per resume section instead of one for the whole resume. All
+    section vectors of all queries are encoded together and searched in the same
+    matrix search; a job's dense score is the max or weighted mean of its section
+    scores (keyword-only hybrid hits included), and results carry the
+    per-section scores under `sections`.
+    """
+    if not queries:
+        return []
+    section_mode = _resolve_section_mode(section_mode)
+    if section_mode != "off" and rescore is not None:
+        raise ValueError("rescore hooks work on single-vector queries; use section_mode='off'")
+    loaded = resident_index(index_prefix)
+    index, meta = loaded.index, loaded.meta
+    backend = backend or meta.get("embed_backend")
+    bm25 = loaded.bm25() if _hybrid_enabled(hybrid) else None
+    needs_matrix = bm25 is not None or rescore is not None or section_mode != "off"
+    embeddings = loaded.embeddings() if needs_matrix else None
+    if rescore is not None and embeddings is None:
+        raise FileNotFoundError(f"Embedding matrix not found for prefix: {index_prefix} (re-run vectorize_jobs)")
+
+    params: Optional[faiss.SearchParameters] = None
+    mask: Optional[np.ndarray] = None
+    if has_filters(filters):
+        attributes = loaded.attributes()
+        if attributes is None:
+            raise FileNotFoundError(f"Job attributes not found for prefix: {index_prefix} (re-run vectorize_jobs)")
+        mask = attributes.mask(filters)
+        # `bits` backs the selector's bitmap and must outlive the searches below
+        selector, bits = id_selector(mask)
+        params = filtered_search_params(meta, selector)
+
+    # Files and texts shared between pairs (e.g. constraint variants of one resume) are read/encoded once
+    file_texts: Dict[str, str] = {}
+    resume_texts: List[str] = []
+    constraint_texts: List[str] = []
+    # Visible text only: LaTeX markup would crowd the model's token window. Uncached
+    # resumes are extracted in one pass so PDFs across the batch share a worker pool.
+    extracted = extract_many([resume_path for resume_path, _ in queries])
+    for resume_path, constraints_path in queries:
+        if resume_path not in file_texts:
+            file_texts[resume_path] = extracted[resume_path][0]
+        resume_texts.append(file_texts[resume_path])
+        key = constraints_path or ""
+        if key not in file_texts:
+            file_texts[key] = _read_constraints(constraints_path)
+        constraint_texts.append(file_texts[key])
+
+    # (query index, section title, section text) for section-level queries
+    section_rows: List[Tuple[int, str, str]] = []
+    if section_mode != "off":
+        for qi, (resume_path, _constraints_path) in enumerate(queries):
+            section_rows.extend((qi, title, text) for title, text in resume_sections(resume_path, resume_texts[qi]))
+
+    unique: Dict[str, int] = {}
+    for text in resume_texts + [t for t in constraint_texts if t.strip()] + [t for _qi, _title, t in section_rows]:
+        unique.setdefault(text, len(unique))
+    emb = build_query_embeddings(list(unique), model_name, backend=backend)
+
+    q = emb[[unique[t] for t in resume_texts]]
+    sq = emb[[unique[t] for _qi, _title, t in section_rows]] if section_rows else None
+    # Optionally blend in constraints signal
+    has_constraints = np.asarray([bool(t.strip()) for t in constraint_texts])
+    if has_constraints.any():
+        weight = _constraint_weight()
+        rows = np.flatnonzero(has_constraints)
+        c = emb[[unique[constraint_texts[i]] for i in rows.tolist()]]
+        q[rows] = _normalize_rows((1.0 - weight) * q[rows] + weight * c)
+        if sq is not None:
+            srows = np.asarray([i for i, (qi, _t, _x) in enumerate(section_rows) if has_constraints[qi]], dtype="int64")
+            if len(srows):
+                c = emb[[unique[constraint_texts[section_rows[i][0]]] for i in srows.tolist()]]
+                sq[srows] = _normalize_rows((1.0 - weight) * sq[srows] + weight * c)
+
+    id_map = meta["id_to_job_id"]
+    rerank_model = rerank_model or os.environ.get("WAT_MATCH_RERANK_MODEL") or None
+    # First-stage list length: wider when a re-ranker gets to pick from it
+    width = max(top_k, rerank_depth) if rerank_model else top_k
+    # Deeper candidate lists give fusion / rescoring something to work with
+    depth = width if bm25 is None else max(width, top_k * 5, FUSION_MIN_DEPTH)
+    if rescore is not None:
+        depth = max(depth, rescore_depth)
+    contributions: List[Dict[int, Dict[str, float]]] = [{} for _ in queries]
+    if sq is not None:
+        section_scores, section_ids = search_batch(index, sq, depth, params)
+        scores, ids, contributions = aggregate_sections(
+            section_rows, sq, section_scores, section_ids, len(queries), depth, section_mode, embeddings
+        )
+    else:
+        scores, ids = search_batch(index, q, depth, params)
+    if rescore is not None:
+        scores, ids = rescore_candidates(q, scores, ids, embeddings, rescore)
+
+    results: List[List[Dict[str, Any]]] = []
+    for i in range(len(queries)):
+        if bm25 is None:
+            results.append(_to_results(scores[i][:width], ids[i][:width], id_map))
+            continue
+        lexical = bm25.scores(f"{resume_texts[i]}\n{constraint_texts[i]}")
+        if mask is not None:
+            allowed = np.zeros(len(lexical), dtype=bool)
+            allowed[: len(mask)] = mask[: len(lexical)]
+            lexical[~allowed] = 0.0
+        if sq is not None:
+            rows = [r for r, (qi, _title, _text) in enumerate(section_rows) if qi == i]
+            keyword_dense_score = _keyword_dense_scorer(
+                embeddings,
+                sq[rows],
+                _section_weight_vector(section_rows, rows),
+                section_mode,
+                _section_titles(section_rows, rows),
+                contributions[i],
+            )
+        else:
+            keyword_dense_score = _keyword_dense_scorer(embeddings, q[i])
+        results.append(_fuse_results(scores[i], ids[i], lexical, width, depth, id_map, keyword_dense_score))
+
+    if rerank_model:
+        candidates = [
+            [(r["_internal_id"], r["job_id"], id_map.text_hash(r["_internal_id"]) or "") for r in res]
+            for res in results
+        ]
+        reranked = rerank(
+            resume_texts,
+            candidates,
+            rerank_model,
+            meta.get("source"),
+            depth=rerank_depth,
+            budget_ms=rerank_budget_ms,
+        )
+        for res, ce_scores in zip(results, reranked):
+            for pos, r in enumerate(res):
+                r["rerank_score"] = ce_scores.get(pos)
+            # Re-ranked candidates first by cross-encoder score, the rest keep first-stage order
+            order = sorted(ce_scores, key=lambda pos: -ce_scores[pos]) + [p for p in range(len(res)) if p not in ce_scores]
+            res[:] = [res[p] for p in order]
+
+    for res, contrib in zip(results, contributions):
+        del res[top_k:]
+        for r in res:
+            internal_id = r.pop("_internal_id", None)
+            if section_mode != "off":
+                r["sections"] = contrib.get(internal_id, {})
+    return results
+
+
 def match_resume_to_jobs(
     resume_path: str,
     index_prefix: str,
     top_k: int = 10,
     model_name: str = os.environ.get("WAT_MATCH_EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2"),
     constraints_path: "Optional[str]" = None,
+    backend: Optional[str] = None,
+    hybrid: Optional[bool] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    rerank_model: Optional[str] = None,
+    rerank_budget_ms: Optional[float] = None,
+    section_mode: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
     """
     Load FAISS index and metadata, embed resume, and return top-k job matches as
-    a list of {job_id, score} sorted by score desc.
+    a list of {job_id, score} sorted by score desc (hybrid dense + BM25 by default,
+    see match_many), restricted to postings passing `filters` and optionally
+    re-ranked by a cross-encoder (`rerank_model`). `backend` defaults
+    to the one the index was built with so query and job vectors come from the same encoder.
     """
-    index, meta = load_index(index_prefix)
-    text = read_file_text(resume_path)
-    q = build_query_embedding(text, model_name)
-    # Optionally blend in constraints signal
-    if constraints_path:
-        try:
-            constraints_text = read_file_text(constraints_path)
-        except FileNotFoundError:
-            constraints_text = ""
-        if constraints_text.strip():
-            c = build_query_embedding(constraints_text, model_name)
-            try:
-                weight = float(os.getenv("WAT_MATCH_CONSTRAINT_WEIGHT", "0.2"))
-            except Exception:
-                weight = 0.2
-            weight = max(0.0, min(1.0, weight))
-            q = (1.0 - weight) * q + weight * c
-            # Re-normalize to unit length for cosine via inner product
-            norm = np.linalg.norm(q, axis=1, keepdims=True)
-            norm[norm == 0] = 1.0
-            q = (q / norm).astype("float32")
-    distances, ids = search(index, q, top_k)
-    id_to_job_id: Dict[str, str] = meta.get("id_to_job_id", {})
-    results: List[Dict[str, Any]] = []
-    for score, internal_id in zip(distances.tolist(), ids.tolist()):
-        if internal_id == -1:
-            continue
-        job_id = id_to_job_id.get(str(internal_id), str(internal_id))
-        results.append({"job_id": job_id, "score": float(score)})
-    return results
+    return match_many(
+        [(resume_path, constraints_path)],
+        index_prefix,
+        top_k=top_k,
+        model_name=model_name,
+        backend=backend,
+        hybrid=hybrid,
+        filters=filters,
+        rerank_model=rerank_model,
+        rerank_budget_ms=rerank_budget_ms,
+        section_mode=section_mode,
+    )[0]
 
 
 __all__ = [
     "read_file_text",
     "build_query_embedding",
+    "build_query_embeddings",
     "load_index",
+    "ResidentIndex",
+    "resident_index",
+    "clear_resident_indexes",
+    "apply_search_params",
+    "filtered_search_params",
     "search",
+    "search_batch",
+    "exact_rescore",
+    "rescore_candidates",
+    "combine_section_scores",
+    "aggregate_sections",
+    "match_many",
     "match_resume_to_jobs",
 ]
 
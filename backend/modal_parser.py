@@ -0,0 +1,344 @@
+import os
+import re
+import json
+import argparse
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+PARSER_BACKENDS = ("bs4", "lxml", "selectolax")
+DEFAULT_PARSER = os.environ.get("WAT_MATCH_MODAL_PARSER", "bs4")
+
+# html.parser (bs4) nests tags exactly as written, while lxml and selectolax repair
+# markup the HTML way: `<p><table>` or `<p><ul>` (which the modal has) ends the <p>
+# early. Renaming every non-void tag to an unknown element before parsing turns
+# that repair off, so both build the same tree as html.parser. Void tags and raw
+# text (script/style) keep their names so they're still parsed as such.
+_TAG_PREFIX = "wat-"
+_KEEP_TAGS = r"(?!(?:area|base|br|col|embed|hr|img|input|link|meta|param|source|track|wbr|script|style)(?![\w-]))"
+# Lookaheads with literal replacements; group templates make re.sub several times slower
+_OPEN_TAG_RE = re.compile(rf"<(?={_KEEP_TAGS}[a-z])", re.IGNORECASE)
+_CLOSE_TAG_RE = re.compile(rf"</(?={_KEEP_TAGS}[a-z])", re.IGNORECASE)
+# html.parser closes `<p/>` at once; the HTML way ignores the slash on non-void tags
+_SELF_CLOSING_RE = re.compile(rf"<({_TAG_PREFIX}[^\s/>]+)([^<>]*)/>")
+# bs4's get_text leaves these out
+_SKIP_TEXT_TAGS = {"script", "style", _TAG_PREFIX + "template"}
+
+
+def _section_key(label: str) -> str:
+    return label.replace(':', '').lower().replace(' ', '_').replace('/', '_')
+
+
+def _parse_bs4(html: str) -> Dict[str, Any]:
+    # Reference implementation: the other backends must reproduce its output exactly
+    try:
+        from bs4 import BeautifulSoup, NavigableString
+    except Exception as e:
+        raise RuntimeError("beautifulsoup4 is required for the bs4 modal parser. Install beautifulsoup4.") from e
+    soup = BeautifulSoup(html, 'html.parser')
+
+    details = {}
+
+    # Extract header info
+    header = soup.find('div', class_='dashboard-header--mini')
+    if header:
+        title_tag = header.find('h2')
+        details['job_title'] = title_tag.get_text(strip=True) if title_tag else 'N/A'
+        company_info = header.find('div', class_='font--14')
+        if company_info:
+            spans = company_info.find_all('span')
+            if len(spans) >= 2:
+                details['organization'] = spans[0].get_text(strip=True)
+                details['division'] = spans[1].get_text(strip=True) if len(spans) > 1 else 'N/A'
+
+    # Scrape the status tags at the top of the modal
+    status_tags = []
+    tag_rail = soup.find('div', class_='tag-rail')
+    if tag_rail:
+        tags = tag_rail.find_all('span', class_='tag-label')
+        for tag in tags:
+            status_tags.append(tag.get_text(strip=True))
+    details['status_tags'] = status_tags
+
+    # Process all sections
+    all_section_anchors = soup.find_all('div', class_='tag__key-value-list')
+
+    for section in all_section_anchors:
+        key_tag = section.find('span', class_='label')
+        if not key_tag:
+            continue
+
+        key = _section_key(key_tag.get_text(strip=True))
+
+        content_parts = []
+
+        # Get content from inside the anchor tag itself
+        initial_p = section.find('p')
+        if initial_p:
+            if key == 'level':
+                levels = [td.get_text(strip=True) for td in initial_p.find_all('td')]
+                content_parts.append(', '.join(levels) if levels else 'N/A')
+            elif key == 'targeted_degrees_and_disciplines':
+                disciplines = [li.get_text(strip=True) for li in initial_p.find_all('li')]
+                content_parts.append('\n'.join(disciplines) if disciplines else 'N/A')
+            elif key == 'additional_information':
+                items = [td.get_text(strip=True) for td in initial_p.find_all('td') if td.get_text(strip=True)]
+                content_parts.append('\n'.join(items) if items else 'N/A')
+            else:
+                initial_text = initial_p.get_text(strip=True, separator='\n')
+                if initial_text:
+                    content_parts.append(initial_text)
+
+        # Look for subsequent sibling tags until the next section starts
+        current = section
+        while True:
+            current = current.find_next_sibling()
+            if current is None:
+                break
+            if current.name == 'div' and 'tag__key-value-list' in current.get('class', []):
+                break
+            if current.name in ['p', 'ul', 'div'] and not isinstance(current, NavigableString):
+                text = current.get_text(strip=True, separator='\n')
+                if text:
+                    content_parts.append(text)
+
+        full_content = '\n\n'.join(part for part in content_parts if part and part.strip())
+
+        if key != 'job_title':
+            details[key] = full_content if full_content else 'N/A'
+
+    return details
+
+
+class _Tree(ABC):
+    """The few tree operations the modal walk needs, over a backend's native nodes."""
+
+    def find(self, node: Any, tag: str, cls: Optional[str] = None) -> Any:
+        return next(self.find_all(node, tag, cls), None)
+
+    @abstractmethod
+    def find_all(self, node: Any, tag: str, cls: Optional[str] = None) -> Iterator[Any]:
+        """Descendants of `node` (not `node` itself) named `tag` with class `cls`, in document order."""
+
+    @abstractmethod
+    def next_element_sibling(self, node: Any) -> Any:
+        """The next sibling that is an element, skipping text and comments; None at the end."""
+
+    @abstractmethod
+    def name(self, node: Any) -> str:
+        """Lower-case tag name, as html.parser reports it."""
+
+    @abstractmethod
+    def classes(self, node: Any) -> List[str]:
+        """The node's class attribute split into tokens ([] when absent)."""
+
+    @abstractmethod
+    def strings(self, node: Any) -> Iterator[str]:
+        """Text nodes under `node` in document order, without comments or script/style/template text."""
+
+    def text(self, node: Any, separator: str = '') -> str:
+        # Same as bs4's get_text(strip=True, separator=...)
+        return separator.join(s for s in (s.strip() for s in self.strings(node)) if s)
+
+
+def _rename_tags(html: str) -> str:
+    html = _CLOSE_TAG_RE.sub("</" + _TAG_PREFIX, _OPEN_TAG_RE.sub("<" + _TAG_PREFIX, html))
+    if "/>" in html:
+        html = _SELF_CLOSING_RE.sub(r"<\1\2></\1>", html)
+    return html
+
+
+class _LxmlTree(_Tree):
+    def find_all(self, node, tag, cls=None):
+        for el in node.iterdescendants(_TAG_PREFIX + tag):
+            if cls is None or cls in (el.get('class') or '').split():
+                yield el
+
+    def next_element_sibling(self, node):
+        sib = node.getnext()
+        while sib is not None and not isinstance(sib.tag, str):
+            # Comments / processing instructions aren't Tags in bs4 either
+            sib = sib.getnext()
+        return sib
+
+    def name(self, node):
+        return node.tag[len(_TAG_PREFIX):] if node.tag.startswith(_TAG_PREFIX) else node.tag
+
+    def classes(self, node):
+        return (node.get('class') or '').split()
+
+    def strings(self, node):
+        # Text and tails of elements, skipping comment bodies (bs4 leaves them out of get_text)
+        if node.text is not None and node.tag not in _SKIP_TEXT_TAGS:
+            yield node.text
+        for child in node:
+            if isinstance(child.tag, str) and child.tag not in _SKIP_TEXT_TAGS:
+                yield from self.strings(child)
+            if child.tail is not None:
+                yield child.tail
+
+
+class _SelectolaxTree(_Tree):
+    def find_all(self, node, tag, cls=None):
+        yield from node.css(f"{_TAG_PREFIX}{tag}.{cls}" if cls else _TAG_PREFIX + tag)
+
+    def next_element_sibling(self, node):
+        sib = node.next
+        while sib is not None and sib.tag in ('-text', '_text', '-comment', '_comment'):
+            sib = sib.next
+        return sib
+
+    def name(self, node):
+        return node.tag[len(_TAG_PREFIX):] if node.tag.startswith(_TAG_PREFIX) else node.tag
+
+    def classes(self, node):
+        return (node.attributes.get('class') or '').split()
+
+    def strings(self, node):
+        child = node.child
+        while child is not None:
+            if child.tag in ('-text', '_text'):
+                yield child.text_content or ''
+            elif child.tag not in _SKIP_TEXT_TAGS and child.tag not in ('-comment', '_comment'):
+                yield from self.strings(child)
+            child = child.next
+
+
+def _parse_tree(tree: _Tree, root: Any) -> Dict[str, Any]:
+    # Mirrors _parse_bs4 step for step
+    details: Dict[str, Any] = {}
+
+    header = tree.find(root, 'div', 'dashboard-header--mini')
+    if header is not None:
+        title_tag = tree.find(header, 'h2')
+        details['job_title'] = tree.text(title_tag) if title_tag is not None else 'N/A'
+        company_info = tree.find(header, 'div', 'font--14')
+        if company_info is not None:
+            spans = list(tree.find_all(company_info, 'span'))
+            if len(spans) >= 2:
+                details['organization'] = tree.text(spans[0])
+                details['division'] = tree.text(spans[1])
+
+    status_tags = []
+    tag_rail = tree.find(root, 'div', 'tag-rail')
+    if tag_rail is not None:
+        status_tags = [tree.text(tag) for tag in tree.find_all(tag_rail, 'span', 'tag-label')]
+    details['status_tags'] = status_tags
+
+    for section in list(tree.find_all(root, 'div', 'tag__key-value-list')):
+        key_tag = tree.find(section, 'span', 'label')
+        if key_tag is None:
+            continue
+        key = _section_key(tree.text(key_tag))
+
+        content_parts = []
+        initial_p = tree.find(section, 'p')
+        if initial_p is not None:
+            if key == 'level':
+                levels = [tree.text(td) for td in tree.find_all(initial_p, 'td')]
+                content_parts.append(', '.join(levels) if levels else 'N/A')
+            elif key == 'targeted_degrees_and_disciplines':
+                disciplines = [tree.text(li) for li in tree.find_all(initial_p, 'li')]
+                content_parts.append('\n'.join(disciplines) if disciplines else 'N/A')
+            elif key == 'additional_information':
+                items = [t for t in (tree.text(td) for td in tree.find_all(initial_p, 'td')) if t]
+                content_parts.append('\n'.join(items) if items else 'N/A')
+            else:
+                initial_text = tree.text(initial_p, '\n')
+                if initial_text:
+                    content_parts.append(initial_text)
+
+        current = section
+        while True:
+            current = tree.next_element_sibling(current)
+            if current is None:
+                break
+            name = tree.name(current)
+            if name == 'div' and 'tag__key-value-list' in tree.classes(current):
+                break
+            if name in ('p', 'ul', 'div'):
+                text = tree.text(current, '\n')
+                if text:
+                    content_parts.append(text)
+
+        full_content = '\n\n'.join(part for part in content_parts if part and part.strip())
+        if key != 'job_title':
+            details[key] = full_content if full_content else 'N/A'
+
+    return details
+
+
+def _parse_lxml(html: str) -> Dict[str, Any]:
+    try:
+        import lxml.html
+    except Exception as e:
+        raise RuntimeError("lxml is required for the lxml modal parser. Install lxml or set WAT_MATCH_MODAL_PARSER=bs4.") from e
+    root = lxml.html.fragment_fromstring(_rename_tags(html), create_parent='div')
+    return _parse_tree(_LxmlTree(), root)
+
+
+def _parse_selectolax(html: str) -> Dict[str, Any]:
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+    except Exception as e:
+        raise RuntimeError("selectolax is required for the selectolax modal parser. Install selectolax or set WAT_MATCH_MODAL_PARSER=bs4.") from e
+    return _parse_tree(_SelectolaxTree(), LexborHTMLParser(_rename_tags(html)).root)
+
+
+_PARSERS: Dict[str, Callable[[str], Dict[str, Any]]] = {
+    "bs4": _parse_bs4,
+    "lxml": _parse_lxml,
+    "selectolax": _parse_selectolax,
+}
+
+
+def parse_job_modal(html: str, backend: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parse the job detail modal's inner HTML into the scraper's `details` dict.
+    `backend` ("bs4", "lxml", "selectolax"; WAT_MATCH_MODAL_PARSER) picks the HTML
+    library; bs4 is the reference, and the faster ones should be checked against
+    it on saved modals with benchmarks/parse_modal.py before being switched on.
+    """
+    backend = backend or DEFAULT_PARSER
+    if backend not in _PARSERS:
+        raise ValueError(f"Unknown modal parser backend: {backend} (expected one of {', '.join(PARSER_BACKENDS)})")
+    return _PARSERS[backend](html)
+
+
+def iter_saved_modals(path: str) -> Iterator[Tuple[str, str]]:
+    """(name, html) for a saved modal file or every .html file in a directory."""
+    paths = [path] if os.path.isfile(path) else sorted(
+        os.path.join(path, name) for name in os.listdir(path) if name.endswith('.html')
+    )
+    for file_path in paths:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            yield os.path.splitext(os.path.basename(file_path))[0], f.read()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="backend.modal_parser", description="Parse saved job modal HTML in bulk")
+    parser.add_argument("path", help="Saved modal .html file or directory of them (see WAT_MATCH_SAVE_MODAL_HTML)")
+    parser.add_argument("--backend", "-b", choices=PARSER_BACKENDS, default=DEFAULT_PARSER)
+    parser.add_argument("--output", "-o", default=None, help="Write one {id, details} JSON object per line here instead of stdout")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else None
+    try:
+        for name, html in iter_saved_modals(args.path):
+            line = json.dumps({"id": name, "details": parse_job_modal(html, args.backend)}, ensure_ascii=False)
+            print(line, file=out)
+    finally:
+        if out:
+            out.close()
+    return 0
+
+
+__all__ = [
+    "PARSER_BACKENDS",
+    "parse_job_modal",
+    "iter_saved_modals",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
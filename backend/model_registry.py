@@ -0,0 +1,112 @@
+import os
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# (model_name, device, backend) -> loaded SentenceTransformer / OnnxEncoder / CrossEncoder
+_MODELS: Dict[Tuple[str, str, str], Any] = {}
+_REGISTRY_LOCK = threading.Lock()
+_LOAD_LOCKS: Dict[Tuple[str, str, str], threading.Lock] = {}
+
+
+def _resolve_device(device: Optional[str]) -> Optional[str]:
+    # None lets sentence-transformers pick (cuda when available, else cpu)
+    return device or os.environ.get("WAT_MATCH_EMBED_DEVICE") or None
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    backend = backend or os.environ.get("WAT_MATCH_EMBED_BACKEND") or "torch"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend} (expected one of {', '.join(BACKENDS)})")
+    return backend
+
+
+def get_model(model_name: str, device: Optional[str] = None, backend: Optional[str] = None) -> Any:
+    """
+    Return a process-wide encoder for (model_name, device, backend), loading it
+    on first use. Concurrent callers asking for the same model wait on a single load.
+    The ONNX backends always run on CPU and expose the same `encode` signature.
+    """
+    device = _resolve_device(device)
+    backend = resolve_backend(backend)
+    key = (model_name, device or "auto", backend)
+    model = _MODELS.get(key)
+    if model is not None:
+        return model
+    with _REGISTRY_LOCK:
+        load_lock = _LOAD_LOCKS.setdefault(key, threading.Lock())
+    with load_lock:
+        model = _MODELS.get(key)
+        if model is None:
+            if backend == "torch":
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(model_name, device=device)
+            else:
+                from backend.onnx_backend import OnnxEncoder
+                model = OnnxEncoder(model_name, quantize=(backend == "onnx-int8"))
+            _MODELS[key] = model
+    return model
+
+
+def get_cross_encoder(model_name: str, device: Optional[str] = None) -> Any:
+    """Process-wide sentence-transformers CrossEncoder (used by the re-ranker), loaded on first use."""
+    device = _resolve_device(device)
+    key = (model_name, device or "auto", "cross-encoder")
+    model = _MODELS.get(key)
+    if model is not None:
+        return model
+    with _REGISTRY_LOCK:
+        load_lock = _LOAD_LOCKS.setdefault(key, threading.Lock())
+    with load_lock:
+        model = _MODELS.get(key)
+        if model is None:
+            from sentence_transformers import CrossEncoder
+            model = CrossEncoder(model_name, device=device)
+            _MODELS[key] = model
+    return model
+
+
+def warmup(
+    model_names: Iterable[str],
+    device: Optional[str] = None,
+    background: bool = True,
+    backend: Optional[str] = None,
+) -> Optional[threading.Thread]:
+    """
+    Load (and run one tiny encode through) each model so the first real call
+    doesn't pay the load cost. With `background` the work happens on a daemon
+    thread, which is returned so callers can join it if they want to.
+    """
+    names = list(model_names)
+
+    def _run() -> None:
+        for name in names:
+            try:
+                get_model(name, device, backend).encode(["warmup"], convert_to_numpy=True)
+            except Exception as e:
+                print(f"Warning: model warmup failed for {name}: {e}")
+
+    if not background:
+        _run()
+        return None
+    thread = threading.Thread(target=_run, name="wat-match-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def clear_models() -> None:
+    """Drop all cached models (mainly useful to free memory in long-lived processes)."""
+    with _REGISTRY_LOCK:
+        _MODELS.clear()
+        _LOAD_LOCKS.clear()
+
+
+__all__ = [
+    "resolve_backend",
+    "get_model",
+    "get_cross_encoder",
+    "warmup",
+    "clear_models",
+]
@@ -0,0 +1,265 @@
+import os
+import json
+import argparse
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ONNX_CACHE_DIR = os.path.join(REPO_ROOT, ".cache", "onnx")
+FP32_FILE = "model.onnx"
+INT8_FILE = "model-int8.onnx"
+CONFIG_FILE = "wat_match_onnx.json"
+
+
+def _require_onnxruntime():
+    try:
+        import onnxruntime  # type: ignore
+    except Exception as e:
+        raise RuntimeError("onnxruntime is required for the ONNX embedding backend. Install onnx and onnxruntime or set embed_backend: torch.") from e
+    return onnxruntime
+
+
+def export_dir_for(model_name: str) -> str:
+    return os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "__"))
+
+
+def export_onnx(model_name: str, quantize: bool = False, out_dir: Optional[str] = None) -> str:
+    """
+    Export the transformer of a sentence-transformers model to ONNX (plus its
+    tokenizer and pooling config) and optionally write a dynamic int8 copy.
+    Exports are cached; returns the path of the requested .onnx file. Files are
+    written under temp names and renamed into place, with the config last, so an
+    interrupted export is redone on the next call rather than left half-written.
+    """
+    out_dir = out_dir or export_dir_for(model_name)
+    fp32_path = os.path.join(out_dir, FP32_FILE)
+    int8_path = os.path.join(out_dir, INT8_FILE)
+    config_path = os.path.join(out_dir, CONFIG_FILE)
+    target = int8_path if quantize else fp32_path
+    if os.path.exists(target) and os.path.exists(config_path):
+        return target
+
+    os.makedirs(out_dir, exist_ok=True)
+    if not (os.path.exists(fp32_path) and os.path.exists(config_path)):
+        import torch
+        from sentence_transformers import SentenceTransformer
+        from sentence_transformers.models import Normalize, Pooling
+
+        st_model = SentenceTransformer(model_name, device="cpu")
+        transformer = st_model[0].auto_model
+        transformer.config.return_dict = False
+        transformer.eval()
+        tokenizer = st_model.tokenizer
+
+        pooling = "mean"
+        normalize = False
+        for module in st_model:
+            if isinstance(module, Pooling):
+                if getattr(module, "pooling_mode_cls_token", False):
+                    pooling = "cls"
+                elif getattr(module, "pooling_mode_max_tokens", False):
+                    pooling = "max"
+            if isinstance(module, Normalize):
+                normalize = True
+
+        dummy = tokenizer(["wat match export"], return_tensors="pt")
+        input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in dummy]
+        dynamic_axes = {n: {0: "batch", 1: "seq"} for n in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "seq"}
+        tmp_path = f"{fp32_path}.{os.getpid()}.tmp"
+        with torch.no_grad():
+            torch.onnx.export(
+                transformer,
+                tuple(dummy[n] for n in input_names),
+                tmp_path,
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14,
+            )
+        tokenizer.save_pretrained(out_dir)
+        os.replace(tmp_path, fp32_path)
+        if os.path.exists(int8_path):
+            # Quantized from the previous export
+            os.remove(int8_path)
+        tmp_path = f"{config_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "model_name": model_name,
+                    "pooling": pooling,
+                    "normalize": normalize,
+                    "max_seq_length": int(st_model.max_seq_length),
+                    "dim": int(st_model.get_sentence_embedding_dimension()),
+                },
+                f,
+                indent=2,
+            )
+        os.replace(tmp_path, config_path)
+
+    if quantize and not os.path.exists(int8_path):
+        _require_onnxruntime()
+        from onnxruntime.quantization import QuantType, quantize_dynamic  # type: ignore
+        tmp_path = f"{int8_path}.{os.getpid()}.tmp"
+        quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+        os.replace(tmp_path, int8_path)
+    return target
+
+
+class OnnxEncoder:
+    """
+    Minimal stand-in for SentenceTransformer.encode backed by ONNX Runtime on CPU.
+    Pooling and normalization follow the exported model's sentence-transformers config.
+    """
+
+    def __init__(self, model_name: str, quantize: bool = False, num_threads: Optional[int] = None):
+        ort = _require_onnxruntime()
+        from transformers import AutoTokenizer
+
+        model_path = export_onnx(model_name, quantize=quantize)
+        model_dir = os.path.dirname(model_path)
+        with open(os.path.join(model_dir, CONFIG_FILE), "r", encoding="utf-8") as f:
+            cfg = json.load(f)
+        self.model_name = model_name
+        self.pooling: str = cfg.get("pooling", "mean")
+        self.normalize: bool = bool(cfg.get("normalize", False))
+        self.max_seq_length: int = int(cfg.get("max_seq_length", 256))
+        self.dim: int = int(cfg["dim"])
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+        opts = ort.SessionOptions()
+        if num_threads:
+            opts.intra_op_num_threads = int(num_threads)
+        self.session = ort.InferenceSession(model_path, opts, providers=["CPUExecutionProvider"])
+        self._input_names = [i.name for i in self.session.get_inputs()]
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def _pool(self, hidden: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        if self.pooling == "cls":
+            return hidden[:, 0]
+        m = mask[:, :, None].astype(hidden.dtype)
+        if self.pooling == "max":
+            return np.where(m > 0, hidden, -1e9).max(axis=1)
+        summed = (hidden * m).sum(axis=1)
+        counts = np.clip(m.sum(axis=1), 1e-9, None)
+        return summed / counts
+
+    def encode(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        **_: Any,
+    ) -> np.ndarray:
+        chunks: List[np.ndarray] = []
+        for start in range(0, len(texts), batch_size):
+            batch = list(texts[start:start + batch_size])
+            enc = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            feeds = {name: enc[name].astype("int64") for name in self._input_names if name in enc}
+            hidden = self.session.run(None, feeds)[0]
+            chunks.append(self._pool(hidden, enc["attention_mask"]))
+        if not chunks:
+            return np.zeros((0, self.dim), dtype="float32")
+        emb = np.concatenate(chunks).astype("float32")
+        if self.normalize:
+            norms = np.linalg.norm(emb, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            emb = emb / norms
+        return emb
+
+
+def check_parity(
+    model_name: str,
+    texts: List[str],
+    backend: str = "onnx-int8",
+    top_k: int = 10,
+    batch_size: int = 64,
+) -> Dict[str, Any]:
+    """
+    Encode `texts` with the torch backend and `backend`, and report per-text
+    cosine drift plus how much each text's top-k neighbour list changes.
+    """
+    from backend.model_registry import get_model
+
+    def _encode(b: str) -> np.ndarray:
+        emb = get_model(model_name, backend=b).encode(texts, batch_size=batch_size, convert_to_numpy=True)
+        norms = np.linalg.norm(emb, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (emb / norms).astype("float32")
+
+    ref = _encode("torch")
+    cand = _encode(backend)
+    cos = np.sum(ref * cand, axis=1)
+    drift = 1.0 - cos
+
+    k = max(1, min(top_k, len(texts) - 1))
+    overlap = []
+    if len(texts) > 1:
+        ref_sims = ref @ ref.T
+        cand_sims = cand @ cand.T
+        np.fill_diagonal(ref_sims, -np.inf)
+        np.fill_diagonal(cand_sims, -np.inf)
+        ref_top = np.argsort(-ref_sims, axis=1)[:, :k]
+        cand_top = np.argsort(-cand_sims, axis=1)[:, :k]
+        overlap = [len(set(a) & set(b)) / k for a, b in zip(ref_top.tolist(), cand_top.tolist())]
+
+    return {
+        "model_name": model_name,
+        "backend": backend,
+        "num_texts": len(texts),
+        "cosine_drift_mean": float(drift.mean()) if len(texts) else 0.0,
+        "cosine_drift_max": float(drift.max()) if len(texts) else 0.0,
+        "cosine_min": float(cos.min()) if len(texts) else 1.0,
+        "top_k": k,
+        "neighbour_overlap_mean": float(np.mean(overlap)) if overlap else 1.0,
+        "neighbour_overlap_min": float(np.min(overlap)) if overlap else 1.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="backend.onnx_backend", description="Export and validate the ONNX embedding backend")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_export = sub.add_parser("export", help="Export the model to ONNX (cached under .cache/onnx)")
+    p_export.add_argument("--model", "-m", required=True, help="sentence-transformers model name")
+    p_export.add_argument("--quantize", action="store_true", help="Also write a dynamic int8 model")
+
+    p_parity = sub.add_parser("parity", help="Report cosine drift against the torch backend")
+    p_parity.add_argument("--model", "-m", required=True, help="sentence-transformers model name")
+    p_parity.add_argument("--jobs", "-j", required=True, help="Jobs JSON used as the parity corpus")
+    p_parity.add_argument("--backend", "-b", choices=["onnx", "onnx-int8"], default="onnx-int8")
+    p_parity.add_argument("--limit", type=int, default=500, help="Max postings to compare")
+    p_parity.add_argument("--top-k", type=int, default=10)
+
+    args = parser.parse_args(argv)
+    if args.command == "export":
+        print(export_onnx(args.model, quantize=args.quantize))
+        return 0
+
+    from backend.vectorizer import read_jobs_json, job_to_text
+    texts = [job_to_text(job) for job in read_jobs_json(args.jobs)[: args.limit]]
+    report = check_parity(args.model, texts, backend=args.backend, top_k=args.top_k)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+__all__ = [
+    "export_onnx",
+    "OnnxEncoder",
+    "check_parity",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,6 +3,8 @@ from typing import List, Dict, Any
 
 from anthropic import AsyncAnthropic
 
+from backend.jobs_io import find_jobs
+
 
 def _read(path: str) -> str:
     try:
@@ -66,9 +68,8 @@ def personalize_resume_and_cover_letter(
     model: str,
 ) -> List[str]:
     resume_base, cover_base = _read(resume_tex_path), _read(cover_letter_tex_path)
-    with open(jobs_json_path, "r", encoding="utf-8") as f:
-        jobs: List[Dict[str, Any]] = json.load(f)
-    by_id = {str(j["id"]): j for j in jobs}
+    # Only the selected postings are kept in memory
+    by_id: Dict[str, Dict[str, Any]] = find_jobs(jobs_json_path, selected_job_ids)
 
     async def generate_docs(job, jid):
         client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
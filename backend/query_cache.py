@@ -0,0 +1,107 @@
+import os
+import re
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from backend.env import env_flag
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+QUERY_CACHE_DIR = os.environ.get("WAT_MATCH_QUERY_CACHE_DIR") or os.path.join(REPO_ROOT, ".cache", "query_vectors")
+MEMORY_ENTRIES = 256
+_WS_RE = re.compile(r"\s+")
+
+# key -> unit-normalized float32 vector, most recently used last
+_MEMORY: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def cache_enabled() -> bool:
+    return env_flag("WAT_MATCH_QUERY_CACHE")
+
+
+def normalize_query_text(text: str) -> str:
+    # Whitespace-only edits (re-saved file, trailing newline) shouldn't miss the cache
+    return _WS_RE.sub(" ", text or "").strip()
+
+
+def query_key(text: str, model_name: str, backend: str) -> str:
+    text_digest = hashlib.sha1(normalize_query_text(text).encode("utf-8")).hexdigest()
+    return hashlib.sha1(f"{model_name}\0{backend}\0{text_digest}".encode("utf-8")).hexdigest()
+
+
+def _disk_path(key: str) -> str:
+    return os.path.join(QUERY_CACHE_DIR, key[:2], f"{key}.npy")
+
+
+def _remember(key: str, vec: np.ndarray) -> None:
+    with _LOCK:
+        _MEMORY[key] = vec
+        _MEMORY.move_to_end(key)
+        while len(_MEMORY) > MEMORY_ENTRIES:
+            _MEMORY.popitem(last=False)
+
+
+def get_vector(key: str) -> Optional[np.ndarray]:
+    """Cached query vector for `key` (memory first, then disk), or None."""
+    with _LOCK:
+        vec = _MEMORY.get(key)
+        if vec is not None:
+            _MEMORY.move_to_end(key)
+            return vec
+    path = _disk_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        vec = np.load(path)
+    except (OSError, ValueError):
+        # Truncated/corrupt entry; treat as a miss and let it be rewritten
+        return None
+    _remember(key, vec)
+    return vec
+
+
+def put_vector(key: str, vec: np.ndarray) -> None:
+    vec = np.ascontiguousarray(vec, dtype="float32")
+    _remember(key, vec)
+    path = _disk_path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, vec)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Warning: could not write query cache entry: {e}")
+
+
+def lookup_many(keys: Sequence[str]) -> Dict[str, np.ndarray]:
+    found: Dict[str, np.ndarray] = {}
+    for key in keys:
+        vec = get_vector(key)
+        if vec is not None:
+            found[key] = vec
+    return found
+
+
+def clear_query_cache(disk: bool = False) -> None:
+    with _LOCK:
+        _MEMORY.clear()
+    if disk and os.path.isdir(QUERY_CACHE_DIR):
+        shutil.rmtree(QUERY_CACHE_DIR, ignore_errors=True)
+
+
+__all__ = [
+    "QUERY_CACHE_DIR",
+    "cache_enabled",
+    "normalize_query_text",
+    "query_key",
+    "get_vector",
+    "put_vector",
+    "lookup_many",
+    "clear_query_cache",
+]
@@ -0,0 +1,201 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.jobs_io import find_jobs
+from backend.model_registry import get_cross_encoder
+from backend.query_cache import normalize_query_text
+from backend.vectorizer import job_to_text, text_hash
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RERANK_CACHE_DIR = os.environ.get("WAT_MATCH_RERANK_CACHE_DIR") or os.path.join(REPO_ROOT, ".cache", "rerank")
+DEFAULT_RERANK_DEPTH = 50
+DEFAULT_BUDGET_MS = float(os.environ.get("WAT_MATCH_RERANK_BUDGET_MS", "300"))
+# Resumes whose scores are kept in memory
+MEMORY_ENTRIES = 256
+# Starting guess for CPU cost per (resume, job) pair until a real call has been timed
+_INITIAL_SECONDS_PER_PAIR = 0.01
+
+# model name -> smoothed seconds per scored pair
+_PAIR_COST: Dict[str, float] = {}
+_COST_LOCK = threading.Lock()
+# (model name, resume hash) -> {job text hash: score}, most recently used last
+_SCORES: "OrderedDict[Tuple[str, str], Dict[str, float]]" = OrderedDict()
+_SCORES_LOCK = threading.Lock()
+
+
+def resume_hash(text: str) -> str:
+    return hashlib.sha1(normalize_query_text(text).encode("utf-8")).hexdigest()
+
+
+def _cache_path(model_name: str, rhash: str) -> str:
+    return os.path.join(RERANK_CACHE_DIR, model_name.replace("/", "__"), f"{rhash}.json")
+
+
+def _remember(key: Tuple[str, str], scores: Dict[str, float]) -> None:
+    # Caller holds _SCORES_LOCK
+    _SCORES[key] = scores
+    _SCORES.move_to_end(key)
+    while len(_SCORES) > MEMORY_ENTRIES:
+        _SCORES.popitem(last=False)
+
+
+def _cached_scores(model_name: str, rhash: str) -> Dict[str, float]:
+    """A copy of the cached scores for a resume (memory first, then disk)."""
+    key = (model_name, rhash)
+    with _SCORES_LOCK:
+        scores = _SCORES.get(key)
+        if scores is not None:
+            _SCORES.move_to_end(key)
+            return dict(scores)
+    scores = {}
+    path = _cache_path(model_name, rhash)
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                scores = {str(k): float(v) for k, v in json.load(f).items()}
+        except (OSError, ValueError):
+            scores = {}
+    with _SCORES_LOCK:
+        # Another thread may have loaded or extended it meanwhile
+        scores.update(_SCORES.get(key) or {})
+        _remember(key, scores)
+        return dict(scores)
+
+
+def _store_scores(model_name: str, rhash: str, scores: Dict[str, float]) -> None:
+    key = (model_name, rhash)
+    with _SCORES_LOCK:
+        # Merged into a new dict, so concurrent requests for one resume keep each other's scores
+        merged = {**(_SCORES.get(key) or {}), **scores}
+        _remember(key, merged)
+    path = _cache_path(model_name, rhash)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(merged, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Warning: could not write re-rank cache: {e}")
+
+
+def clear_rerank_cache() -> None:
+    with _SCORES_LOCK:
+        _SCORES.clear()
+
+
+def seconds_per_pair(model_name: str) -> float:
+    return _PAIR_COST.get(model_name, _INITIAL_SECONDS_PER_PAIR)
+
+
+def _record_cost(model_name: str, num_pairs: int, seconds: float) -> None:
+    if num_pairs <= 0:
+        return
+    observed = seconds / num_pairs
+    with _COST_LOCK:
+        prev = _PAIR_COST.get(model_name)
+        _PAIR_COST[model_name] = observed if prev is None else 0.7 * prev + 0.3 * observed
+
+
+def plan_depth(num_uncached: Sequence[int], depth: int, budget_ms: float, model_name: str) -> int:
+    """
+    How many candidates per query can be re-ranked within `budget_ms` per query,
+    given how many of the first `depth` are not cached yet (`num_uncached[n]` =
+    uncached among the first n). Cached pairs are free.
+    """
+    affordable = int(budget_ms / 1000.0 / max(seconds_per_pair(model_name), 1e-6))
+    n = depth
+    while n > 0 and num_uncached[n] > affordable:
+        n -= 1
+    return n
+
+
+def rerank(
+    query_texts: Sequence[str],
+    candidates: Sequence[Sequence[Tuple[int, str, str]]],
+    model_name: str,
+    jobs_path: Optional[str],
+    depth: int = DEFAULT_RERANK_DEPTH,
+    budget_ms: Optional[float] = None,
+    device: Optional[str] = None,
+) -> List[Dict[int, float]]:
+    """
+    Cross-encoder scores for each query's leading candidates, as one
+    {candidate position: score} dict per query. `candidates[i]` is the query's
+    first-stage ranking as (internal id, job id, job text hash). Per query, N is
+    `depth` capped so the uncached pairs fit in `budget_ms` at the measured
+    per-pair cost; all uncached pairs of all queries go through one batched
+    predict call. Scores are cached on disk by (model, resume hash, job text hash).
+    """
+    budget_ms = DEFAULT_BUDGET_MS if budget_ms is None else float(budget_ms)
+    plans: List[Tuple[str, Dict[str, float], int]] = []
+    # One scores dict per resume for the whole call, so a pair scored for one query is seen by the others
+    by_resume: Dict[str, Dict[str, float]] = {}
+    for text, cands in zip(query_texts, candidates):
+        rhash = resume_hash(text)
+        cached = by_resume.get(rhash)
+        if cached is None:
+            cached = by_resume[rhash] = _cached_scores(model_name, rhash)
+        limit = min(depth, len(cands))
+        uncached = [0]
+        for _iid, _job_id, h in cands[:limit]:
+            uncached.append(uncached[-1] + (0 if h in cached else 1))
+        plans.append((rhash, cached, plan_depth(uncached, limit, budget_ms, model_name)))
+
+    # Uncached (query, job text hash) pairs; job texts are only loaded for these
+    wanted: Dict[str, str] = {}
+    pending: List[Tuple[int, str, str]] = []
+    seen = set()
+    for qi, ((rhash, cached, n), cands) in enumerate(zip(plans, candidates)):
+        for _iid, job_id, h in cands[:n]:
+            # Queries sharing a resume share its cache, so each pair is scored once
+            if h not in cached and (rhash, h) not in seen:
+                seen.add((rhash, h))
+                pending.append((qi, job_id, h))
+                wanted[job_id] = h
+
+    if pending:
+        texts: Dict[str, str] = {}
+        if jobs_path and os.path.exists(jobs_path):
+            for jid, job in find_jobs(jobs_path, wanted).items():
+                text = job_to_text(job)
+                # Skip postings edited since the index was built; their cached hash no longer applies
+                if text_hash(text) == wanted[jid]:
+                    texts[jid] = text
+        else:
+            print(f"Warning: jobs file for re-ranking not found ({jobs_path}); keeping first-stage order")
+        pairs = [(qi, h, texts[job_id]) for qi, job_id, h in pending if job_id in texts]
+        if pairs:
+            model = get_cross_encoder(model_name, device)
+            start = time.perf_counter()
+            scores = model.predict([(query_texts[qi], text) for qi, _h, text in pairs], batch_size=32, show_progress_bar=False)
+            _record_cost(model_name, len(pairs), time.perf_counter() - start)
+            touched = set()
+            for (qi, h, _text), score in zip(pairs, np.asarray(scores, dtype="float32").reshape(-1).tolist()):
+                plans[qi][1][h] = float(score)
+                touched.add(plans[qi][0])
+            for rhash in touched:
+                _store_scores(model_name, rhash, by_resume[rhash])
+
+    out: List[Dict[int, float]] = []
+    for (rhash, cached, n), cands in zip(plans, candidates):
+        out.append({pos: cached[h] for pos, (_iid, _job_id, h) in enumerate(cands[:n]) if h in cached})
+    return out
+
+
+__all__ = [
+    "DEFAULT_RERANK_DEPTH",
+    "resume_hash",
+    "seconds_per_pair",
+    "plan_depth",
+    "rerank",
+    "clear_rerank_cache",
+]
@@ -1,11 +1,23 @@
 import asyncio
 from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup, NavigableString
+import html
 import json
 import re
 import os
+import time
+import random
 import traceback
 
+try:
+    from backend import waits
+    from backend.jobs_io import is_jsonl_path, iter_jobs, write_jobs_jsonl
+    from backend.modal_parser import parse_job_modal
+except ImportError:
+    # Run directly as `python backend/scraper.py`
+    import waits
+    from jobs_io import is_jsonl_path, iter_jobs, write_jobs_jsonl
+    from modal_parser import parse_job_modal
+
 # ==============================================================================
 # --- CONFIGURATION ---
 # ==============================================================================
@@ -17,12 +29,47 @@ URL_FRAGMENTS = ["/myAccount/co-op/full/jobs.htm", "/myAccount/co-op/direct/jobs
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 OUTPUTS_DIR = os.path.join(REPO_ROOT, "outputs")
 os.makedirs(OUTPUTS_DIR, exist_ok=True)
-OUTPUT_FILE = os.path.join(OUTPUTS_DIR, "waterlooworks_jobs.json")
+# Set WAT_MATCH_JOBS_FILE to a .jsonl/.ndjson path to write one job per line instead of a JSON array
+OUTPUT_FILE = os.environ.get("WAT_MATCH_JOBS_FILE") or os.path.join(OUTPUTS_DIR, "waterlooworks_jobs.json")
 STORAGE_STATE_FILE = os.path.join(OUTPUTS_DIR, "storage_state.json")
 
 # Scraping Behavior
 ACTION_TIMEOUT = 60000  # Increased to 60 seconds for potentially slower connections/renders
-RETRY_ATTEMPTS = 2      # How many times to retry scraping a single job's details
+RETRY_ATTEMPTS = int(os.environ.get("WAT_MATCH_SCRAPE_RETRIES", "3"))  # Attempts per job's details
+RETRY_BACKOFF_S = 2.0   # First retry delay; doubles per attempt, with jitter
+SLOW_MO_MS = int(os.environ.get("WAT_MATCH_SLOW_MO", "0"))  # Delay per browser action, for watching/debugging only
+# Browser pages (same logged-in context) scraping job details concurrently
+DETAIL_WORKERS = int(os.environ.get("WAT_MATCH_SCRAPE_WORKERS", "4"))
+KEYWORD_SEARCH_SELECTOR = 'input[name="emptyStateKeywordSearch"]'
+# "capture" parses the job list/detail payloads the site fetches in the background
+# (falling back to the rendered DOM when a payload isn't recognized); "dom" only reads the DOM
+SCRAPE_MODE = os.environ.get("WAT_MATCH_SCRAPE_MODE", "dom").lower()
+CAPTURE_WAIT_S = 5.0        # How long to wait for a recognizable payload after an action
+CAPTURE_MAX_MISSES = 3      # Consecutive misses before a page stops waiting on payloads
+CAPTURE_MAX_BYTES = 5_000_000
+MODAL_SELECTOR = "div.modal__inner--document-overlay:not(#pdfPreviewModal_modalInner)"
+# Directory to save each scraped modal's HTML as <job id>.html, for offline re-parsing and benchmarks/parse_modal.py
+SAVE_MODAL_HTML_DIR = os.environ.get("WAT_MATCH_SAVE_MODAL_HTML")
+# True once the modal's header shows the posting `title` clicked in the listing (when given) and its
+# markup is unchanged since the previous poll. The header title is what the modal parser reads to name a
+# posting; none of the fields it reads carries the posting ID.
+MODAL_SETTLED_JS = """
+({selector, title}) => {
+    const modal = document.querySelector(selector);
+    if (!modal || !modal.querySelector('.tag__key-value-list')) return false;
+    const heading = modal.querySelector('.dashboard-header--mini h2');
+    const norm = text => (text || '').replace(/\\s+/g, ' ').trim();
+    if (title && heading && !norm(heading.textContent).includes(norm(title))) return false;
+    const size = modal.innerHTML.length;
+    const settled = modal.dataset.watMatchSize === String(size);
+    modal.dataset.watMatchSize = String(size);
+    return settled;
+}
+"""
+# The modal element is reused between postings, so its size marker is dropped before opening the next one
+MODAL_RESET_JS = """
+selector => document.querySelectorAll(selector).forEach(modal => { delete modal.dataset.watMatchSize; })
+"""
 # ==============================================================================
 
 
@@ -30,16 +77,64 @@ def save_data_incrementally(data, filename):
     """Saves the collected data to a JSON file."""
     try:
         # Ensure directory exists for the target file
-        dirpath = os.path.dirname(os.path.abspath(filename))
-        if dirpath:
-            os.makedirs(dirpath, exist_ok=True)
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+        if is_jsonl_path(filename):
+            write_jobs_jsonl(data, filename)
+        else:
+            dirpath = os.path.dirname(os.path.abspath(filename))
+            if dirpath:
+                os.makedirs(dirpath, exist_ok=True)
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=4)
         print(f"\n✅ Progress saved. {len(data)} jobs collected so far in '{filename}'")
     except Exception as e:
         print(f"❌ Error saving data: {e}")
 
 
+# Reads every listing row in one browser round-trip: the ID header cell (Full
+# layout), each cell's text, and the title link text of the two candidate cells
+ROWS_JS = """
+rows => rows.map(row => {
+    const th = row.querySelector('th');
+    const tds = Array.from(row.querySelectorAll('td'));
+    const linkText = td => {
+        const a = td ? td.querySelector('a') : null;
+        return a ? a.innerText : null;
+    };
+    return {
+        th: th ? th.innerText : null,
+        cells: tds.map(td => td.innerText),
+        links: [linkText(tds[0]), linkText(tds[1])],
+    };
+})
+"""
+
+
+async def _read_rows(page):
+    list_selector = "tbody tr.table__row--body"
+    await waits.wait_selector(page, list_selector, "list_rows")
+    return await page.locator(list_selector).evaluate_all(ROWS_JS)
+
+
+def _summary_from_row(row, job_id, title_td_index):
+    """Build a job summary from a row read by ROWS_JS, or None (with a warning) if it's unusable."""
+    cells = row["cells"]
+    job_title = row["links"][title_td_index]
+    # Check if the job title link exists
+    if job_title is None:
+        print(f"  Warning: No job title link found for job ID {job_id}, skipping...")
+        return None
+    return {
+        "id": job_id.strip(),
+        "title": job_title.strip(),
+        "company": cells[2].strip(),
+        "division": cells[3].strip(),
+        "openings": cells[4].strip(),
+        "city": cells[5].strip(),
+        "level": cells[6].strip(),
+        "deadline": cells[7].strip(),
+    }
+
+
 async def get_job_summaries_from_page_full(page):
     """
     Gets a list of job summaries from the current page for the Full/Cycle postings layout.
@@ -48,64 +143,24 @@ async def get_job_summaries_from_page_full(page):
     job_summaries = []
     
     try:
-        list_selector = "tbody tr.table__row--body"
-        await page.wait_for_selector(list_selector, timeout=ACTION_TIMEOUT)
-        
-        rows = await page.locator(list_selector).all()
-        
-        for row in rows:
-            try:
-                # Determine whether the row uses a header (th) for job ID
-                th_cells = row.locator("th")
-                th_count = await th_cells.count()
+        for row in await _read_rows(page):
+            # Ensure we have enough cells before accessing them
+            if len(row["cells"]) < 8:
+                print(f"  Warning: Row has only {len(row['cells'])} cells, skipping...")
+                continue
 
-                cells = row.locator("td")
-                cell_count = await cells.count()
-                
-                # Ensure we have enough cells before accessing them
-                if cell_count < 8:
-                    print(f"  Warning: Row has only {cell_count} cells, skipping...")
-                    continue
+            # Extract job ID and compute the correct index for the job title column
+            if row["th"] is not None:
+                numbers = re.findall(r"\d+", row["th"])
+                job_id = numbers[-1] if numbers else row["th"].strip()
+                title_td_index = 0
+            else:
+                job_id = row["cells"][0]
+                title_td_index = 1
 
-                # Extract job ID and compute the correct index for the job title column
-                if th_count >= 1:
-                    th_text = await th_cells.nth(0).inner_text(timeout=ACTION_TIMEOUT)
-                    numbers = re.findall(r"\d+", th_text)
-                    job_id = numbers[-1] if numbers else th_text.strip()
-                    title_td_index = 0
-                else:
-                    job_id = await cells.nth(0).inner_text(timeout=ACTION_TIMEOUT)
-                    title_td_index = 1
-
-                job_title_element = cells.nth(title_td_index).locator("a").first
-                
-                # Check if the job title link exists
-                if await job_title_element.count() == 0:
-                    print(f"  Warning: No job title link found for job ID {job_id}, skipping...")
-                    continue
-                
-                job_title = await job_title_element.inner_text(timeout=ACTION_TIMEOUT)
-                company = await cells.nth(2).inner_text(timeout=ACTION_TIMEOUT)
-                division = await cells.nth(3).inner_text(timeout=ACTION_TIMEOUT)
-                openings = await cells.nth(4).inner_text(timeout=ACTION_TIMEOUT)
-                city = await cells.nth(5).inner_text(timeout=ACTION_TIMEOUT)
-                level = await cells.nth(6).inner_text(timeout=ACTION_TIMEOUT)
-                deadline = await cells.nth(7).inner_text(timeout=ACTION_TIMEOUT)
-                
-                job_summaries.append({
-                    "id": job_id.strip(),
-                    "title": job_title.strip(),
-                    "company": company.strip(),
-                    "division": division.strip(),
-                    "openings": openings.strip(),
-                    "city": city.strip(),
-                    "level": level.strip(),
-                    "deadline": deadline.strip(),
-                    "link_locator": job_title_element
-                })
-            except Exception as e:
-                print(f"  Warning: Could not parse a row. Error: {e}")
-                continue
+            summary = _summary_from_row(row, job_id, title_td_index)
+            if summary is not None:
+                job_summaries.append(summary)
                 
     except Exception as e:
         print(f"  Error getting job summaries: {e}")
@@ -122,51 +177,15 @@ async def get_job_summaries_from_page_direct(page):
     job_summaries = []
     
     try:
-        list_selector = "tbody tr.table__row--body"
-        await page.wait_for_selector(list_selector, timeout=ACTION_TIMEOUT)
-        
-        rows = await page.locator(list_selector).all()
-        
-        for row in rows:
-            try:
-                cells = row.locator("td")
-                cell_count = await cells.count()
-                
-                # Ensure we have enough cells before accessing them
-                if cell_count < 8:
-                    print(f"  Warning: Row has only {cell_count} cells, skipping...")
-                    continue
-                
-                job_id = await cells.nth(0).inner_text(timeout=ACTION_TIMEOUT)
-                job_title_element = cells.nth(1).locator("a").first
-                
-                # Check if the job title link exists
-                if await job_title_element.count() == 0:
-                    print(f"  Warning: No job title link found for job ID {job_id}, skipping...")
-                    continue
-                
-                job_title = await job_title_element.inner_text(timeout=ACTION_TIMEOUT)
-                company = await cells.nth(2).inner_text(timeout=ACTION_TIMEOUT)
-                division = await cells.nth(3).inner_text(timeout=ACTION_TIMEOUT)
-                openings = await cells.nth(4).inner_text(timeout=ACTION_TIMEOUT)
-                city = await cells.nth(5).inner_text(timeout=ACTION_TIMEOUT)
-                level = await cells.nth(6).inner_text(timeout=ACTION_TIMEOUT)
-                deadline = await cells.nth(7).inner_text(timeout=ACTION_TIMEOUT)
-                
-                job_summaries.append({
-                    "id": job_id.strip(),
-                    "title": job_title.strip(),
-                    "company": company.strip(),
-                    "division": division.strip(),
-                    "openings": openings.strip(),
-                    "city": city.strip(),
-                    "level": level.strip(),
-                    "deadline": deadline.strip(),
-                    "link_locator": job_title_element
-                })
-            except Exception as e:
-                print(f"  Warning: Could not parse a row. Error: {e}")
+        for row in await _read_rows(page):
+            # Ensure we have enough cells before accessing them
+            if len(row["cells"]) < 8:
+                print(f"  Warning: Row has only {len(row['cells'])} cells, skipping...")
                 continue
+
+            summary = _summary_from_row(row, row["cells"][0], 1)
+            if summary is not None:
+                job_summaries.append(summary)
                 
     except Exception as e:
         print(f"  Error getting job summaries: {e}")
@@ -175,7 +194,185 @@ async def get_job_summaries_from_page_direct(page):
     return job_summaries
 
 
-async def get_job_summaries_from_page(page):
+# ==============================================================================
+# --- BACKGROUND PAYLOAD CAPTURE ---
+# ==============================================================================
+# Payload field name (lowercased, "_" removed) -> job summary key
+SUMMARY_FIELD_ALIASES = {
+    "id": "id", "jobid": "id", "postingid": "id",
+    "title": "title", "jobtitle": "title", "postingtitle": "title",
+    "organization": "company", "organizationname": "company", "company": "company", "employer": "company",
+    "division": "division", "divisionname": "division",
+    "openings": "openings", "numberofopenings": "openings", "jobopenings": "openings", "numberofjobopenings": "openings",
+    "city": "city", "jobcity": "city", "location": "city",
+    "level": "level", "levels": "level", "joblevel": "level",
+    "deadline": "deadline", "applicationdeadline": "deadline", "appdeadline": "deadline",
+}
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACES_RE = re.compile(r"[ \t]+")
+
+
+def _alias(key):
+    return SUMMARY_FIELD_ALIASES.get(str(key).lower().replace("_", ""))
+
+
+def _payload_text(value):
+    if isinstance(value, list):
+        return ", ".join(_payload_text(v) for v in value)
+    if isinstance(value, dict):
+        return _payload_text(value.get("name") or value.get("label") or value.get("value") or "")
+    return _SPACES_RE.sub(" ", _TAG_RE.sub(" ", str(value if value is not None else ""))).strip()
+
+
+def _walk_json(value):
+    yield value
+    if isinstance(value, dict):
+        for v in value.values():
+            yield from _walk_json(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _walk_json(v)
+
+
+def parse_job_list_payload(body, content_type):
+    """Job summaries from a JSON list payload, or None if it doesn't look like the job table."""
+    if "json" not in content_type:
+        return None
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    for node in _walk_json(data):
+        if not isinstance(node, list) or not node or not all(isinstance(item, dict) for item in node):
+            continue
+        keys = [{_alias(k) for k in item} for item in node]
+        if sum(1 for k in keys if "id" in k and "title" in k) * 2 < len(node):
+            continue
+        summaries = []
+        for item in node:
+            summary = {field: "N/A" for field in ("id", "title", "company", "division", "openings", "city", "level", "deadline")}
+            for key, value in item.items():
+                field = _alias(key)
+                if field:
+                    summary[field] = _payload_text(value) or "N/A"
+            if summary["id"] != "N/A":
+                summaries.append(summary)
+        return summaries or None
+    return None
+
+
+def _mentions_posting(text, job_id, title):
+    # Modal fragments show the posting's title rather than its ID; JSON postings carry the ID
+    if job_id in text:
+        return True
+    return bool(title) and (title in text or html.escape(title) in text)
+
+
+def parse_job_detail_payload(body, content_type, job_id, title=None):
+    """
+    Details for `job_id` (listed as `title`) from a modal HTML fragment or a JSON
+    posting, or None if not recognized.
+    """
+    if not _mentions_posting(body, job_id, title):
+        # Responses for other postings (or unrelated requests)
+        return None
+    if "html" in content_type and "tag__key-value-list" in body:
+        return parse_job_modal_html(body, job_id)
+    if "json" not in content_type:
+        return None
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    for node in _walk_json(data):
+        if isinstance(node, str) and "tag__key-value-list" in node and _mentions_posting(node, job_id, title):
+            return parse_job_modal_html(node, job_id)
+        if isinstance(node, dict) and any(_alias(k) == "id" and _payload_text(v) == job_id for k, v in node.items()):
+            details = {}
+            for key, value in node.items():
+                if isinstance(value, (dict, list)) and not _payload_text(value):
+                    continue
+                name = re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", str(key)).lower().replace(" ", "_").replace("/", "_")
+                details[name] = _payload_text(value) or "N/A"
+            # A bare summary row (ID + a few columns) isn't a posting
+            if len(details) >= 8:
+                return details
+    return None
+
+
+class ResponseCapture:
+    """
+    Keeps the XHR/fetch JSON and HTML bodies a page receives so the scraper can
+    parse them instead of waiting for the rendered DOM. `mark()` before an
+    action, then `wait_for(parse, mark)` returns the first payload after it that
+    `parse(body, content_type)` recognizes. After CAPTURE_MAX_MISSES consecutive
+    misses of a kind the page stops waiting for that kind and uses the DOM.
+    """
+
+    def __init__(self, page):
+        self.payloads = []
+        self.misses = {}
+        self._arrived = asyncio.Event()
+        page.on("response", self._on_response)
+
+    async def _on_response(self, response):
+        try:
+            if response.request.resource_type not in ("xhr", "fetch"):
+                return
+            content_type = (response.headers.get("content-type") or "").lower()
+            if "json" not in content_type and "html" not in content_type:
+                return
+            body = await response.text()
+        except Exception:
+            # Bodies of redirects / aborted requests aren't available
+            return
+        if len(body) > CAPTURE_MAX_BYTES:
+            return
+        self.payloads.append((content_type, body))
+        del self.payloads[:-50]
+        self._arrived.set()
+
+    def mark(self):
+        """Forget earlier payloads; call right before the action whose response is wanted."""
+        self.payloads.clear()
+
+    async def wait_for(self, kind, parse):
+        if self.misses.get(kind, 0) >= CAPTURE_MAX_MISSES:
+            return None
+        deadline = time.monotonic() + CAPTURE_WAIT_S
+        seen = 0
+        while True:
+            for content_type, body in self.payloads[seen:]:
+                try:
+                    result = parse(body, content_type)
+                except Exception:
+                    result = None
+                if result:
+                    self.misses[kind] = 0
+                    return result
+            seen = len(self.payloads)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.misses[kind] = self.misses.get(kind, 0) + 1
+                return None
+            self._arrived.clear()
+            try:
+                await asyncio.wait_for(self._arrived.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+
+
+async def get_job_summaries_from_page(page, capture=None):
+    """Job summaries for the current listing page: from a captured payload when available, else the DOM."""
+    if capture is not None:
+        summaries = await capture.wait_for("list", parse_job_list_payload)
+        if summaries:
+            print(f"  Found {len(summaries)} jobs on this page (captured payload).")
+            return summaries
+    return await get_job_summaries_from_dom(page)
+
+
+async def get_job_summaries_from_dom(page):
     """Dispatches to the appropriate parser based on current URL."""
     try:
         current_url = page.url
@@ -188,96 +385,46 @@ async def get_job_summaries_from_page(page):
         return await get_job_summaries_from_page_full(page)
 
 
-async def scrape_job_details(page):
+def parse_job_modal_html(modal_html, job_id=None):
+    """
+    Parses the job detail modal's HTML into a details dict, with the HTML library
+    picked by WAT_MATCH_MODAL_PARSER (see backend/modal_parser.py).
+    """
+    if SAVE_MODAL_HTML_DIR and job_id:
+        save_modal_html(job_id, modal_html)
+    return parse_job_modal(modal_html)
+
+
+def save_modal_html(job_id, modal_html):
+    try:
+        os.makedirs(SAVE_MODAL_HTML_DIR, exist_ok=True)
+        path = os.path.join(SAVE_MODAL_HTML_DIR, f"{re.sub(r'[^A-Za-z0-9_-]', '_', str(job_id))}.html")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(modal_html)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"    Warning: could not save modal HTML for job ID {job_id}: {e}")
+
+
+async def scrape_job_details(page, job_id=None, title=None):
     """
     Scrapes all detailed information from the job detail modal.
     """
     print("    Scraping job details from the modal...")
     
     try:
-        modal_selector = "div.modal__inner--document-overlay:not(#pdfPreviewModal_modalInner)"
-        modal_locator = page.locator(modal_selector)
+        modal_locator = page.locator(MODAL_SELECTOR)
         
-        await modal_locator.wait_for(state='visible', timeout=ACTION_TIMEOUT)
+        await waits.wait_visible(modal_locator, "modal_open")
         
-        # Wait for content to load
-        await page.wait_for_load_state("networkidle", timeout=ACTION_TIMEOUT)
-        await asyncio.sleep(0.5)  # Small delay to ensure content is rendered
+        # Wait for the posting's sections to render and stop changing
+        await waits.wait_function(
+            page, MODAL_SETTLED_JS, "modal_content", arg={"selector": MODAL_SELECTOR, "title": title}, polling=100
+        )
         
         modal_html = await modal_locator.inner_html(timeout=ACTION_TIMEOUT)
-        soup = BeautifulSoup(modal_html, 'html.parser')
-        
-        details = {}
-        
-        # Extract header info
-        header = soup.find('div', class_='dashboard-header--mini')
-        if header:
-            title_tag = header.find('h2')
-            details['job_title'] = title_tag.get_text(strip=True) if title_tag else 'N/A'
-            company_info = header.find('div', class_='font--14')
-            if company_info:
-                spans = company_info.find_all('span')
-                if len(spans) >= 2:
-                    details['organization'] = spans[0].get_text(strip=True)
-                    details['division'] = spans[1].get_text(strip=True) if len(spans) > 1 else 'N/A'
-
-        # Scrape the status tags at the top of the modal
-        status_tags = []
-        tag_rail = soup.find('div', class_='tag-rail')
-        if tag_rail:
-            tags = tag_rail.find_all('span', class_='tag-label')
-            for tag in tags:
-                status_tags.append(tag.get_text(strip=True))
-        details['status_tags'] = status_tags
-
-        # Process all sections
-        all_section_anchors = soup.find_all('div', class_='tag__key-value-list')
-        
-        for section in all_section_anchors:
-            key_tag = section.find('span', class_='label')
-            if not key_tag:
-                continue
-                
-            key = key_tag.get_text(strip=True).replace(':', '').lower().replace(' ', '_').replace('/', '_')
-            
-            content_parts = []
-            
-            # Get content from inside the anchor tag itself
-            initial_p = section.find('p')
-            if initial_p:
-                if key == 'level':
-                    levels = [td.get_text(strip=True) for td in initial_p.find_all('td')]
-                    content_parts.append(', '.join(levels) if levels else 'N/A')
-                elif key == 'targeted_degrees_and_disciplines':
-                    disciplines = [li.get_text(strip=True) for li in initial_p.find_all('li')]
-                    content_parts.append('\n'.join(disciplines) if disciplines else 'N/A')
-                elif key == 'additional_information':
-                    items = [td.get_text(strip=True) for td in initial_p.find_all('td') if td.get_text(strip=True)]
-                    content_parts.append('\n'.join(items) if items else 'N/A')
-                else:
-                    initial_text = initial_p.get_text(strip=True, separator='\n')
-                    if initial_text:
-                        content_parts.append(initial_text)
-
-            # Look for subsequent sibling tags until the next section starts
-            current = section
-            while True:
-                current = current.find_next_sibling()
-                if current is None:
-                    break
-                if current.name == 'div' and 'tag__key-value-list' in current.get('class', []):
-                    break
-                if current.name in ['p', 'ul', 'div'] and not isinstance(current, NavigableString):
-                    text = current.get_text(strip=True, separator='\n')
-                    if text:
-                        content_parts.append(text)
-            
-            full_content = '\n\n'.join(part for part in content_parts if part and part.strip())
-            
-            if key != 'job_title':
-                details[key] = full_content if full_content else 'N/A'
-
-        return details
+        return parse_job_modal_html(modal_html, job_id)
         
     except Exception as e:
         print(f"    Error scraping job details: {e}")
@@ -287,23 +434,112 @@ async def scrape_job_details(page):
 async def close_modal_safely(page):
     """Safely close the modal if it's open."""
     try:
-        modal_locator = page.locator('div.modal__inner--document-overlay:not(#pdfPreviewModal_modalInner)')
+        modal_locator = page.locator(MODAL_SELECTOR)
         if await modal_locator.is_visible(timeout=2000):
             print("    Closing modal...")
             close_button = modal_locator.locator('nav.floating--action-bar button:has(i:text-is("close"))')
             if await close_button.count() > 0:
                 await close_button.click()
-                await modal_locator.wait_for(state='hidden', timeout=ACTION_TIMEOUT)
+                await waits.wait_hidden(modal_locator, "modal_close")
                 print("    Modal closed.")
             else:
                 # Fallback: try ESC key
                 await page.keyboard.press('Escape')
-                await asyncio.sleep(0.5)
+                await waits.wait_hidden(modal_locator, "modal_close_escape", ceiling_ms=5000)
     except Exception as e:
         print(f"    Warning: Could not close modal. Error: {e}")
 
 
-async def main(max_jobs: int = None):
+async def _title_link(row):
+    """Job title link of a listing row (the Full layout puts the ID in a <th>)."""
+    title_td_index = 0 if await row.locator("th").count() >= 1 else 1
+    return row.locator("td").nth(title_td_index).locator("a").first
+
+
+async def open_job_by_id(page, jobs_url, job_id, capture=None):
+    """Show posting `job_id` in the listing via keyword search and click its title."""
+    try:
+        search_box = await waits.wait_selector(page, KEYWORD_SEARCH_SELECTOR, "search_box", ceiling_ms=5000)
+    except Exception:
+        await page.goto(jobs_url)
+        search_box = await waits.wait_selector(page, KEYWORD_SEARCH_SELECTOR, "search_box_reload")
+    await search_box.fill('')
+    await search_box.fill(job_id)
+    await search_box.press('Enter')
+    row = page.locator("tbody tr.table__row--body", has_text=job_id).first
+    await waits.wait_visible(row, "search_result")
+    link = await _title_link(row)
+    if await link.count() == 0:
+        raise Exception(f"No job title link found for job ID {job_id}")
+    if capture is not None:
+        # Only responses to the click can be this posting's details (the search results can't)
+        capture.mark()
+    await page.evaluate(MODAL_RESET_JS, MODAL_SELECTOR)
+    await link.click()
+
+
+async def _captured_job_details(page, capture, job_id, title=None):
+    details = await capture.wait_for(
+        "detail", lambda body, content_type: parse_job_detail_payload(body, content_type, job_id, title)
+    )
+    if details:
+        # Let the modal finish opening so it can be closed before the next search
+        try:
+            await waits.wait_visible(page.locator(MODAL_SELECTOR), "modal_open", ceiling_ms=5000)
+        except Exception:
+            pass
+    return details
+
+
+async def detail_worker(name, page, jobs_url, queue, results, throttle, capture=None):
+    """
+    Takes job summaries off `queue`, opens each posting on this worker's own page
+    and appends the summary with its `details` to `results` (parsed from the
+    captured detail payload when `capture` is given and recognizes one). Failed attempts back
+    off exponentially; `throttle["pause_until"]` makes every worker back off
+    together when the server starts failing requests.
+    """
+    while True:
+        job_summary = await queue.get()
+        try:
+            job_id = job_summary['id']
+            title = job_summary.get('title')
+            print(f"  [{name}] Processing job ID {job_id}")
+            for attempt in range(RETRY_ATTEMPTS):
+                delay = throttle["pause_until"] - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                try:
+                    await close_modal_safely(page)
+                    await open_job_by_id(page, jobs_url, job_id, capture)
+                    job_details = await _captured_job_details(page, capture, job_id, title) if capture is not None else None
+                    if not job_details:
+                        job_details = await scrape_job_details(page, job_id, title)
+                    if 'error' in job_details:
+                        raise Exception(job_details['error'])
+                    job_summary['details'] = job_details
+                    break
+                except Exception as e:
+                    print(f"    [{name}] Attempt {attempt + 1} FAILED for job ID {job_id}. Error: {e}")
+                    if attempt < RETRY_ATTEMPTS - 1:
+                        backoff = RETRY_BACKOFF_S * (2 ** attempt) * (1 + random.random())
+                        throttle["pause_until"] = max(throttle["pause_until"], time.monotonic() + backoff / 2)
+                        print(f"    [{name}] Retrying in {backoff:.1f}s...")
+                        await close_modal_safely(page)
+                        await asyncio.sleep(backoff)
+                    else:
+                        print(f"    [{name}] All {RETRY_ATTEMPTS} attempts failed for Job ID {job_id}.")
+                        job_summary['details'] = {"error": str(e)}
+            await close_modal_safely(page)
+            results.append(job_summary)
+            # Save progress every 10 jobs
+            if len(results) % 10 == 0:
+                save_data_incrementally(results, OUTPUT_FILE)
+        finally:
+            queue.task_done()
+
+
+async def main(max_jobs: int = None, workers: int = None):
     """Launches a browser, waits for user login, then scrapes all jobs and their details."""
     if max_jobs is not None:
         print(f"Scraping limited to {max_jobs} jobs maximum.")
@@ -311,30 +547,33 @@ async def main(max_jobs: int = None):
         print("Scraping all available jobs (unlimited).")
         
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False, slow_mo=50)
+        browser = await p.chromium.launch(headless=False, slow_mo=SLOW_MO_MS)
         # Reuse storage state if available to avoid re-login
         if os.path.exists(STORAGE_STATE_FILE):
             context = await browser.new_context(storage_state=STORAGE_STATE_FILE)
         else:
             context = await browser.new_context()
         page = await context.new_page()
+        list_capture = ResponseCapture(page) if SCRAPE_MODE == "capture" else None
+        if list_capture is not None:
+            print("Capturing job list/detail payloads (DOM scraping as fallback).")
 
         all_jobs_data = []
         already_scraped_ids = set()
+        worker_tasks = []
         
         # Resume from previous scrape if file exists
         if os.path.exists(OUTPUT_FILE):
             print(f"Found existing output file '{OUTPUT_FILE}'. Loading it to resume scrape.")
             try:
-                with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
-                    all_jobs_data = json.load(f)
-                    # Only skip jobs that were scraped successfully (no error key)
-                    already_scraped_ids = {
-                        job['id'] for job in all_jobs_data 
-                        if 'details' in job and isinstance(job['details'], dict) and 'error' not in job['details']
-                    }
-                    print(f"Resuming. Already scraped {len(already_scraped_ids)} job details successfully.")
-            except (json.JSONDecodeError, FileNotFoundError) as e:
+                all_jobs_data = list(iter_jobs(OUTPUT_FILE))
+                # Only skip jobs that were scraped successfully (no error key)
+                already_scraped_ids = {
+                    job['id'] for job in all_jobs_data 
+                    if 'details' in job and isinstance(job['details'], dict) and 'error' not in job['details']
+                }
+                print(f"Resuming. Already scraped {len(already_scraped_ids)} job details successfully.")
+            except (ValueError, FileNotFoundError) as e:
                 print(f"Warning: Could not load output file. Starting from scratch. Error: {e}")
                 all_jobs_data = []
 
@@ -351,6 +590,8 @@ async def main(max_jobs: int = None):
             
             # Navigate to the job postings page
             job_postings_url = "https://waterlooworks.uwaterloo.ca/myAccount/co-op/full/jobs.htm"
+            if list_capture is not None:
+                list_capture.mark()
             await page.goto(job_postings_url)
             await page.wait_for_url(lambda url: any(frag in url for frag in URL_FRAGMENTS), timeout=ACTION_TIMEOUT)
             
@@ -362,6 +603,21 @@ async def main(max_jobs: int = None):
             except Exception:
                 pass
             
+            # Detail pool: each worker gets its own page in this logged-in context
+            jobs_url = page.url
+            workers = max(1, workers or DETAIL_WORKERS)
+            print(f"Scraping job details with {workers} concurrent page(s).")
+            queue = asyncio.Queue(maxsize=workers * 2)
+            throttle = {"pause_until": 0.0}
+            worker_pages = [await context.new_page() for _ in range(workers)]
+            worker_captures = [ResponseCapture(worker_page) if list_capture is not None else None for worker_page in worker_pages]
+            await asyncio.gather(*(worker_page.goto(jobs_url) for worker_page in worker_pages))
+            for n, worker_page in enumerate(worker_pages):
+                worker_tasks.append(asyncio.create_task(
+                    detail_worker(f"w{n + 1}", worker_page, jobs_url, queue, all_jobs_data, throttle, worker_captures[n])
+                ))
+            remaining = None if max_jobs is None else max_jobs - len(all_jobs_data)
+
             page_num = 1
             consecutive_failures = 0
             max_consecutive_failures = 5
@@ -370,7 +626,7 @@ async def main(max_jobs: int = None):
                 print(f"\n--- Processing Page {page_num} ---")
                 
                 try:
-                    job_summaries_on_page = await get_job_summaries_from_page(page)
+                    job_summaries_on_page = await get_job_summaries_from_page(page, list_capture)
                     
                     if not job_summaries_on_page:
                         print("No jobs found on this page, ending process.")
@@ -382,56 +638,16 @@ async def main(max_jobs: int = None):
                         if job_summary['id'] in already_scraped_ids:
                             print(f"  -> Skipping job {i+1}/{len(job_summaries_on_page)} (ID: {job_summary['id']}) - Already scraped.")
                             continue
+                        if remaining is not None and remaining <= 0:
+                            break
+                        # Blocks while the workers are saturated, so listing doesn't run far ahead
+                        await queue.put(job_summary)
+                        if remaining is not None:
+                            remaining -= 1
 
-                        print(f"  -> Processing job {i+1}/{len(job_summaries_on_page)} (ID: {job_summary['id']})")
-                        
-                        job_details = None
-                        for attempt in range(RETRY_ATTEMPTS):
-                            try:
-                                # Close any open modal first
-                                await close_modal_safely(page)
-                                
-                                # Click the job link
-                                await job_summary['link_locator'].click()
-                                
-                                # Scrape details
-                                job_details = await scrape_job_details(page)
-                                
-                                if 'error' not in job_details:
-                                    job_summary['details'] = job_details
-                                    break
-                                else:
-                                    raise Exception(job_details['error'])
-                                    
-                            except Exception as e:
-                                print(f"    Attempt {attempt + 1} FAILED. Error: {e}")
-                                if attempt < RETRY_ATTEMPTS - 1:
-                                    print("    Retrying...")
-                                    await close_modal_safely(page)
-                                    await asyncio.sleep(2)
-                                else:
-                                    print(f"    All {RETRY_ATTEMPTS} attempts failed for Job ID {job_summary['id']}.")
-                                    job_summary['details'] = {"error": str(e)}
-                        
-                        # Always try to close modal after processing
-                        await close_modal_safely(page)
-                        
-                        # Remove the link_locator before saving
-                        if 'link_locator' in job_summary:
-                            del job_summary['link_locator']
-                        
-                        all_jobs_data.append(job_summary)
-                        
-                        # Check if we've reached the max_jobs limit
-                        if max_jobs is not None and len(all_jobs_data) >= max_jobs:
-                            print(f"\n✅ Reached maximum job limit of {max_jobs}. Stopping scrape.")
-                            save_data_incrementally(all_jobs_data, OUTPUT_FILE)
-                            await browser.close()
-                            return
-                        
-                        # Save progress every 10 jobs
-                        if len(all_jobs_data) % 10 == 0:
-                            save_data_incrementally(all_jobs_data, OUTPUT_FILE)
+                    if remaining is not None and remaining <= 0:
+                        print(f"\n✅ Reached maximum job limit of {max_jobs}. Waiting for detail workers to finish...")
+                        break
 
                     # Save after each page
                     save_data_incrementally(all_jobs_data, OUTPUT_FILE)
@@ -453,20 +669,23 @@ async def main(max_jobs: int = None):
                             first_job_id_before = await first_job_element.inner_text(timeout=ACTION_TIMEOUT)
                             
                             # Click next button
+                            if list_capture is not None:
+                                list_capture.mark()
                             await next_button.click()
                             
                             # Wait for page content to change
                             print("  Waiting for page content to update...")
                             try:
-                                await page.wait_for_function(
-                                    f'document.querySelector("tbody tr.table__row--body td")?.innerText !== "{first_job_id_before}"',
-                                    timeout=ACTION_TIMEOUT
+                                await waits.wait_function(
+                                    page,
+                                    'before => document.querySelector("tbody tr.table__row--body td")?.innerText !== before',
+                                    "next_page",
+                                    arg=first_job_id_before,
                                 )
                                 print("  Page content updated.")
                                 page_num += 1
                             except:
                                 print("  Warning: Could not verify page update. Continuing anyway...")
-                                await asyncio.sleep(2)
                                 page_num += 1
                         else:
                             print("\nNext button is disabled. Last page reached.")
@@ -487,18 +706,25 @@ async def main(max_jobs: int = None):
                     
                     # Try to recover by reloading the page
                     try:
-                        await page.reload(wait_until="networkidle", timeout=ACTION_TIMEOUT)
-                        await asyncio.sleep(2)
+                        if list_capture is not None:
+                            list_capture.mark()
+                        await page.reload(wait_until="domcontentloaded", timeout=ACTION_TIMEOUT)
+                        await waits.wait_selector(page, "tbody tr.table__row--body", "list_rows_reload")
                     except:
                         print("Could not reload page. Ending scrape.")
                         break
 
+            # Let the workers drain what's been queued
+            await queue.join()
+
         except asyncio.TimeoutError:
             print(f"\n❌ Operation timed out. The page might be slow or you didn't navigate to the jobs page within 5 minutes.")
         except Exception as e:
             print(f"\n❌ A critical error occurred: {e}")
             traceback.print_exc()
         finally:
+            for task in worker_tasks:
+                task.cancel()
             if all_jobs_data:
                 save_data_incrementally(all_jobs_data, OUTPUT_FILE)
                 print(f"\n{'='*60}")
@@ -508,6 +734,8 @@ async def main(max_jobs: int = None):
                 print(f"  - Successful: {successful_jobs}")
                 print(f"  - Failed: {failed_jobs}")
                 print(f"{'='*60}")
+            print("\nWait timings:")
+            print(waits.format_report())
             await browser.close()
 
 
@@ -516,7 +744,7 @@ if __name__ == "__main__":
 
 
 # Convenience wrapper for orchestration
-def scrape_jobs(max_jobs: int = None) -> str:
+def scrape_jobs(max_jobs: int = None, workers: int = None) -> str:
     """
     Runs the interactive scraper and returns the absolute path to the produced
     jobs JSON file. Ensures the scraper runs with the backend directory as the
@@ -524,12 +752,13 @@ def scrape_jobs(max_jobs: int = None) -> str:
     
     Args:
         max_jobs: Maximum number of jobs to scrape. If None, scrapes all available jobs.
+        workers: Browser pages scraping job details concurrently (default: WAT_MATCH_SCRAPE_WORKERS or 4).
     """
     backend_dir = os.path.dirname(__file__)
     prev_cwd = os.getcwd()
     try:
         os.chdir(backend_dir)
-        asyncio.run(main(max_jobs=max_jobs))
+        asyncio.run(main(max_jobs=max_jobs, workers=workers))
         return OUTPUT_FILE
     finally:
         os.chdir(prev_cwd)
\ No newline at end of file
@@ -0,0 +1,413 @@
+import os
+import re
+import json
+import hashlib
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+TEXT_CACHE_DIR = os.environ.get("WAT_MATCH_TEXT_CACHE_DIR") or os.path.join(REPO_ROOT, ".cache", "text")
+# Bump when extraction output changes so stale disk entries are ignored
+EXTRACTOR_VERSION = 2
+# Total uncached PDF pages before extraction moves to a process pool, and pages per pool task.
+# Spawned workers each start a fresh interpreter, so the pool only pays off on longer documents
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get("WAT_MATCH_PDF_PARALLEL_PAGES", "32"))
+PDF_PAGES_PER_TASK = 4
+# Files and extracted documents kept in memory (each cache is bounded separately)
+MEMORY_ENTRIES = 256
+
+# Commands whose next N brace groups are layout/metadata rather than visible text
+_DROP_ARGS = {
+    "vspace": 1, "hspace": 1, "setlength": 2, "addtolength": 2, "label": 1, "ref": 1,
+    "includegraphics": 1, "color": 1, "textcolor": 1, "definecolor": 3, "fontsize": 2,
+    "titleformat": 5, "titlespacing": 4, "pagestyle": 1, "thispagestyle": 1, "usepackage": 1,
+    "documentclass": 1, "input": 1, "include": 1, "newcommand": 2, "renewcommand": 2,
+    "newenvironment": 3, "renewenvironment": 3, "cite": 1, "url": 0, "href": 1,
+    "raisebox": 1, "rule": 2, "extracolsep": 1, "hypersetup": 1, "geometry": 1,
+}
+_SECTION_COMMANDS = {"section", "subsection", "subsubsection", "paragraph", "cvsection"}
+# Environments whose leading brace groups are column specs / widths
+_ENV_ARGS = {"tabular": 1, "tabular*": 2, "tabularx": 2, "minipage": 1, "array": 1, "longtable": 1}
+_SYMBOLS = {
+    "&": "&", "%": "%", "$": "$", "#": "#", "_": "_", "{": "{", "}": "}",
+    "\\": "\n", ",": " ", ";": " ", ":": " ", "!": "", " ": " ", "-": "",
+    "item": "\n- ", "par": "\n", "newline": "\n", "linebreak": "\n", "LaTeX": "LaTeX", "TeX": "TeX",
+    "textbar": "|", "textbullet": "-", "ldots": "...", "dots": "...", "textendash": "-", "textemdash": "-",
+}
+_SECTION_MARK = "\x00"
+_COMMAND_RE = re.compile(r"[A-Za-z]+\*?")
+_COMMENT_RE = re.compile(r"(?<!\\)%.*")
+_WS_RE = re.compile(r"[ \t\r\f\v]+")
+# A line on its own naming a usual resume section (PDF text has no markup to go by)
+_HEADING_RE = re.compile(
+    r"^\s*(?:work |professional |relevant |technical )?"
+    r"(?:experience|education|skills|projects|highlights|awards|publications|leadership|"
+    r"volunteering|volunteer experience|certifications|interests|summary|activities)\s*:?\s*$",
+    re.IGNORECASE,
+)
+
+_LOCK = threading.Lock()
+# (abs path, mtime_ns, size) -> content hash; content hash -> (text, sections); most recently used last
+_BY_STAT: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_BY_HASH: "OrderedDict[str, Tuple[str, List[Tuple[str, str]]]]" = OrderedDict()
+
+
+def _skip_ws(s: str, i: int) -> int:
+    while i < len(s) and s[i] in " \t\r\n":
+        i += 1
+    return i
+
+
+def _group_end(s: str, i: int, open_ch: str = "{", close_ch: str = "}") -> int:
+    """Index just past the group starting at s[i] == open_ch (unbalanced input ends at len(s))."""
+    depth = 0
+    while i < len(s):
+        ch = s[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == open_ch:
+            depth += 1
+        elif ch == close_ch:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return len(s)
+
+
+def _skip_args(s: str, i: int, groups: int) -> int:
+    # Optional [..] arguments, then `groups` mandatory {..} groups
+    j = _skip_ws(s, i)
+    while j < len(s) and s[j] == "[":
+        j = _skip_ws(s, _group_end(s, j, "[", "]"))
+    for _ in range(groups):
+        j = _skip_ws(s, j)
+        if j < len(s) and s[j] == "{":
+            j = _group_end(s, j)
+        else:
+            break
+    return j
+
+
+def _strip(s: str) -> str:
+    out: List[str] = []
+    i = 0
+    n = len(s)
+    while i < n:
+        ch = s[i]
+        if ch == "\\":
+            m = _COMMAND_RE.match(s, i + 1)
+            if m:
+                name = m.group()
+                i += 1 + len(name)
+            else:
+                name = s[i + 1:i + 2]
+                i += 2
+            if name in _SYMBOLS:
+                out.append(_SYMBOLS[name])
+            elif name in ("begin", "end"):
+                j = _skip_ws(s, i)
+                env = ""
+                if j < n and s[j] == "{":
+                    end = _group_end(s, j)
+                    env = s[j + 1:end - 1].strip()
+                    j = end
+                i = _skip_args(s, j, _ENV_ARGS.get(env, 0)) if name == "begin" else j
+                out.append("\n")
+            elif name.rstrip("*") in _SECTION_COMMANDS:
+                j = _skip_args(s, i, 0)
+                if j < n and s[j] == "{":
+                    end = _group_end(s, j)
+                    out.append(f"\n{_SECTION_MARK}{_strip(s[j + 1:end - 1]).strip()}\n")
+                    i = end
+                else:
+                    i = j
+            elif name.rstrip("*") in _DROP_ARGS:
+                i = _skip_args(s, i, _DROP_ARGS[name.rstrip("*")])
+            else:
+                # Formatting/user macros: drop the name and options, keep their text arguments
+                i = _skip_args(s, i, 0)
+            continue
+        if ch == "$":
+            i += 1
+            continue
+        if ch == "{":
+            i += 1
+            continue
+        if ch == "}":
+            out.append(" ")
+            i += 1
+            continue
+        if ch == "&":
+            out.append(" ")
+        elif ch == "~":
+            out.append(" ")
+        else:
+            out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def _clean(text: str) -> str:
+    text = text.replace("---", "-").replace("--", "-").replace("``", '"').replace("''", '"')
+    lines = [_WS_RE.sub(" ", line).strip() for line in text.split("\n")]
+    lines = [line for line in lines if line and line != "-" and line != "|"]
+    return "\n".join(lines)
+
+
+def latex_sections(src: str) -> List[Tuple[str, str]]:
+    """
+    Visible text of a LaTeX document as (section title, text) pairs; text before
+    the first section (e.g. the heading block) gets the title "". Comments, the
+    preamble, layout commands and markup are dropped.
+    """
+    src = _COMMENT_RE.sub("", src)
+    begin = src.find("\\begin{document}")
+    if begin >= 0:
+        end = src.find("\\end{document}", begin)
+        src = src[begin + len("\\begin{document}"):end if end >= 0 else len(src)]
+    parts = _strip(src).split(_SECTION_MARK)
+    sections: List[Tuple[str, str]] = []
+    head = _clean(parts[0])
+    if head:
+        sections.append(("", head))
+    for part in parts[1:]:
+        title, _, body = part.partition("\n")
+        sections.append((_clean(title), _clean(body)))
+    return sections
+
+
+def latex_to_text(src: str) -> str:
+    return "\n\n".join(f"{title}\n{body}" if title else body for title, body in latex_sections(src))
+
+
+def _fitz():
+    try:
+        import fitz  # PyMuPDF
+    except Exception as e:
+        raise RuntimeError("PyMuPDF is required to read PDFs. Install PyMuPDF or provide a .tex/.txt resume.") from e
+    return fitz
+
+
+def _pdf_page_texts(path: str, start: int, stop: int) -> List[str]:
+    # Runs in pool workers: each opens its own handle, PyMuPDF documents don't cross processes
+    doc = _fitz().open(path)
+    try:
+        return [doc[i].get_text() for i in range(start, stop)]
+    finally:
+        doc.close()
+
+
+def _pdf_workers() -> int:
+    workers = int(os.environ.get("WAT_MATCH_PDF_WORKERS", "0") or 0)
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def pdf_pages(paths: Sequence[str]) -> Dict[str, List[str]]:
+    """
+    Page texts for each PDF in `paths`. Pages are split into ranges and read in
+    a process pool once the total page count reaches PDF_PARALLEL_MIN_PAGES
+    (pool start-up costs more than a short resume takes to read serially).
+    Workers are spawned rather than forked: this runs on the match service's
+    and the GUI's threads, and a fork can inherit a lock another thread holds.
+    """
+    fitz = _fitz()
+    counts: Dict[str, int] = {}
+    for path in paths:
+        doc = fitz.open(path)
+        counts[path] = doc.page_count
+        doc.close()
+    tasks = [
+        (path, start, min(start + PDF_PAGES_PER_TASK, n))
+        for path, n in counts.items()
+        for start in range(0, n, PDF_PAGES_PER_TASK)
+    ]
+    workers = min(_pdf_workers(), len(tasks))
+    if sum(counts.values()) < PDF_PARALLEL_MIN_PAGES or workers <= 1:
+        chunks = [_pdf_page_texts(*task) for task in tasks]
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            chunks = list(pool.map(_pdf_page_texts, *zip(*tasks)))
+    pages: Dict[str, List[str]] = {path: [] for path in counts}
+    for (path, _start, _stop), chunk in zip(tasks, chunks):
+        pages[path].extend(chunk)
+    return pages
+
+
+def read_file_text(path: str) -> str:
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+    # Basic extractor for .tex or .txt; if PDF is needed, we can extend
+    _, ext = os.path.splitext(path)
+    if ext.lower() in {".tex", ".txt", ".md"}:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            return f.read()
+    elif ext.lower() == ".pdf":
+        return "".join(pdf_pages([path])[path])
+    else:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            return f.read()
+
+
+def text_sections(text: str) -> List[Tuple[str, str]]:
+    """Split plain resume text (e.g. from a PDF) at lines that look like section headings."""
+    sections: List[Tuple[str, List[str]]] = [("", [])]
+    for line in text.split("\n"):
+        if _HEADING_RE.match(line):
+            sections.append((line.strip(), []))
+        else:
+            sections[-1][1].append(line)
+    return [(title, "\n".join(body)) for title, body in sections if title or body]
+
+
+def _pdf_result(pages: List[str]) -> Tuple[str, List[Tuple[str, str]]]:
+    text = _clean("\n".join(pages))
+    return text, text_sections(text)
+
+
+def _extract(path: str) -> Tuple[str, List[Tuple[str, str]]]:
+    _, ext = os.path.splitext(path)
+    if ext.lower() == ".pdf":
+        return _pdf_result(pdf_pages([path])[path])
+    raw = read_file_text(path)
+    if ext.lower() == ".tex":
+        sections = latex_sections(raw)
+        return latex_to_text(raw), sections
+    return raw, [("", raw)]
+
+
+def _disk_path(content_hash: str) -> str:
+    return os.path.join(TEXT_CACHE_DIR, f"{content_hash}.json")
+
+
+def _content_hash(path: str) -> str:
+    h = hashlib.sha1(f"v{EXTRACTOR_VERSION}:{os.path.splitext(path)[1].lower()}:".encode("utf-8"))
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _remember(cache: OrderedDict, key: Any, value: Any) -> None:
+    # Caller holds _LOCK
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > MEMORY_ENTRIES:
+        cache.popitem(last=False)
+
+
+def _recall(cache: OrderedDict, key: Any) -> Any:
+    # Caller holds _LOCK
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _lookup(path: str) -> Tuple[str, Optional[Tuple[str, List[Tuple[str, str]]]]]:
+    """(content hash, cached result or None) for `path`, checking memory then disk."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+    st = os.stat(path)
+    stat_key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    with _LOCK:
+        content_hash = _recall(_BY_STAT, stat_key)
+        hit = _recall(_BY_HASH, content_hash) if content_hash is not None else None
+        if hit is not None:
+            return content_hash, hit
+    content_hash = _content_hash(path)
+    with _LOCK:
+        _remember(_BY_STAT, stat_key, content_hash)
+        hit = _recall(_BY_HASH, content_hash)
+    if hit is not None:
+        return content_hash, hit
+
+    disk = _disk_path(content_hash)
+    if os.path.exists(disk):
+        try:
+            with open(disk, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            hit = (data["text"], [(t, b) for t, b in data["sections"]])
+        except (OSError, ValueError, KeyError):
+            hit = None
+    if hit is not None:
+        with _LOCK:
+            _remember(_BY_HASH, content_hash, hit)
+    return content_hash, hit
+
+
+def _store(content_hash: str, result: Tuple[str, List[Tuple[str, str]]]) -> None:
+    disk = _disk_path(content_hash)
+    try:
+        os.makedirs(TEXT_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{disk}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"text": result[0], "sections": result[1]}, f, ensure_ascii=False)
+        os.replace(tmp_path, disk)
+    except OSError as e:
+        print(f"Warning: could not write text cache entry: {e}")
+    with _LOCK:
+        _remember(_BY_HASH, content_hash, result)
+
+
+def extract_many(paths: Sequence[str]) -> Dict[str, Tuple[str, List[Tuple[str, str]]]]:
+    """
+    (clean text, sections) per path for resume/constraints files: LaTeX is
+    stripped to visible text, PDFs are read page-parallel (see pdf_pages) and
+    whitespace-normalized, other formats go through read_file_text. Results are
+    cached by (path, mtime, size) and, behind that, by content hash (in memory and
+    on disk), so a touched-but-unchanged file is not re-extracted. Uncached PDFs
+    across all `paths` share one worker pool.
+    """
+    hashes: Dict[str, str] = {}
+    results: Dict[str, Tuple[str, List[Tuple[str, str]]]] = {}
+    # content hash -> one path to extract it from
+    pending: Dict[str, str] = {}
+    for path in paths:
+        if path in hashes:
+            continue
+        content_hash, hit = _lookup(path)
+        hashes[path] = content_hash
+        if hit is not None:
+            results[content_hash] = hit
+        else:
+            pending.setdefault(content_hash, path)
+
+    pdfs = [path for path in pending.values() if os.path.splitext(path)[1].lower() == ".pdf"]
+    pages = pdf_pages(pdfs) if pdfs else {}
+    for content_hash, path in pending.items():
+        result = _pdf_result(pages[path]) if path in pages else _extract(path)
+        _store(content_hash, result)
+        results[content_hash] = result
+    return {path: results[content_hash] for path, content_hash in hashes.items()}
+
+
+def extract(path: str) -> Tuple[str, List[Tuple[str, str]]]:
+    return extract_many([path])[path]
+
+
+def extract_text(path: str) -> str:
+    return extract(path)[0]
+
+
+def extract_sections(path: str) -> List[Tuple[str, str]]:
+    return extract(path)[1]
+
+
+__all__ = [
+    "read_file_text",
+    "pdf_pages",
+    "text_sections",
+    "latex_sections",
+    "latex_to_text",
+    "extract_many",
+    "extract",
+    "extract_text",
+    "extract_sections",
+]
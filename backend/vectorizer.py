@@ -1,23 +1,25 @@
 import os
 import json
+import hashlib
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 
 import numpy as np
 
 # Use faiss-cpu package
 import faiss  # type: ignore
-from sentence_transformers import SentenceTransformer
+
+from backend.jobs_io import iter_jobs
+from backend.embedding_store import EmbeddingWriter, embeddings_path, iter_rows, load_embeddings
+from backend.filters import AttributeBuilder, attributes_path, write_attributes
+from backend.id_map import id_map_path, load_id_map, write_id_map
+from backend.lexical import BM25Builder, bm25_path, write_bm25
+from backend.encoder import DEFAULT_TOKEN_BUDGET, encode_bucketed, format_encode_stats, iter_encoded_shards
+from backend.model_registry import get_model, resolve_backend
 
 
 def read_jobs_json(jobs_json_path: str) -> List[Dict[str, Any]]:
-    if not os.path.exists(jobs_json_path):
-        raise FileNotFoundError(f"Jobs JSON not found at: {jobs_json_path}")
-    with open(jobs_json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    if not isinstance(data, list):
-        raise ValueError("Expected jobs JSON to be a list of job objects")
-    return data
+    return list(iter_jobs(jobs_json_path))
 
 
 def job_to_text(job: Dict[str, Any]) -> str:
@@ -61,18 +63,12 @@ def job_to_text(job: Dict[str, Any]) -> str:
     return " \n ".join(parts)
 
 
-def build_embeddings(
-    texts: List[str],
-    model_name: str,
-    batch_size: int = 64,
-) -> np.ndarray:
-    model = SentenceTransformer(model_name)
-    embeddings = model.encode(
-      texts,
-      batch_size=batch_size,
-      show_progress_bar=True,
-      convert_to_numpy=True,
-    )
+def text_hash(text: str) -> str:
+    # Content fingerprint used to decide whether a posting needs re-encoding
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def normalize_embeddings(embeddings: np.ndarray) -> np.ndarray:
     # Normalize to use cosine similarity via inner product
     norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
     norms[norms == 0] = 1.0
@@ -80,15 +76,343 @@ def build_embeddings(
     return embeddings.astype("float32")
 
 
-def build_faiss_index(embeddings: np.ndarray, ids: List[int]) -> faiss.Index:
+def _resolve_workers(workers: Optional[int]) -> int:
+    if workers is None:
+        try:
+            workers = int(os.environ.get("WAT_MATCH_ENCODE_WORKERS", "1"))
+        except ValueError:
+            workers = 1
+    return max(1, workers)
+
+
+def iter_embeddings(
+    texts: Iterable[str],
+    model_name: str,
+    device: Optional[str] = None,
+    backend: Optional[str] = None,
+    token_budget: Optional[int] = None,
+    workers: Optional[int] = None,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Iterator[np.ndarray]:
+    """
+    Yield unit-length float32 embeddings for consecutive shards of `texts`, in
+    order, so callers can add them to an index as they arrive. `workers` > 1
+    shards large inputs across a process pool (see backend.encoder).
+    """
+    token_budget = DEFAULT_TOKEN_BUDGET if token_budget is None or token_budget <= 0 else token_budget
+    for chunk in iter_encoded_shards(
+        texts,
+        model_name,
+        workers=_resolve_workers(workers),
+        device=device,
+        backend=backend,
+        token_budget=token_budget,
+        stats=stats,
+    ):
+        yield normalize_embeddings(chunk)
+
+
+def build_embeddings(
+    texts: List[str],
+    model_name: str,
+    batch_size: int = 64,
+    device: Optional[str] = None,
+    backend: Optional[str] = None,
+    token_budget: Optional[int] = None,
+    stats: Optional[Dict[str, Any]] = None,
+    workers: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Encode `texts` into unit-length float32 vectors. By default texts are
+    batched longest-first under a padded-token budget (see backend.encoder);
+    a `token_budget` <= 0 falls back to fixed `batch_size` batches in input order.
+    Encode stats are copied into `stats` when a dict is passed.
+    """
+    if _resolve_workers(workers) > 1:
+        chunks = list(iter_embeddings(texts, model_name, device, backend, token_budget, workers, stats))
+        if stats is not None:
+            print(format_encode_stats(stats))
+        return np.concatenate(chunks) if chunks else np.zeros((0, 0), dtype="float32")
+
+    model = get_model(model_name, device, backend)
+    token_budget = DEFAULT_TOKEN_BUDGET if token_budget is None else token_budget
+    if token_budget > 0:
+        embeddings, encode_stats = encode_bucketed(
+            model,
+            texts,
+            token_budget=token_budget,
+            baseline_batch_size=batch_size,
+            show_progress_bar=True,
+        )
+        print(format_encode_stats(encode_stats))
+        if stats is not None:
+            stats.update(encode_stats)
+    else:
+        embeddings = model.encode(
+          texts,
+          batch_size=batch_size,
+          show_progress_bar=True,
+          convert_to_numpy=True,
+        )
+    return normalize_embeddings(embeddings)
+
+
+INDEX_TYPES = ("auto", "flat", "ivf_flat", "hnsw", "ivf_pq")
+# IVF families: need a training sample before vectors can be added
+TRAINED_INDEX_TYPES = {"ivf_flat", "ivf_pq"}
+# How vectors are stored; float16/sq8 use FAISS scalar quantizers (IVF-PQ always stores PQ codes)
+VECTOR_DTYPES = ("float32", "float16", "sq8")
+_SQ_FACTORY = {"float16": "SQfp16", "sq8": "SQ8"}
+# recall@10 vs exact search that IVF nprobe is raised to reach at build time
+TARGET_RECALL = float(os.environ.get("WAT_MATCH_TARGET_RECALL", "0.95"))
+# Stop raising nprobe once doubling it gains less recall than this (PQ caps recall below the target)
+_MIN_RECALL_GAIN = 0.01
+
+
+def choose_index_type(num_vectors: int, dim: int) -> str:
+    """Pick an index family for the corpus size: exact while brute force is cheap, then graph/IVF."""
+    if num_vectors < 20_000:
+        return "flat"
+    if num_vectors < 300_000:
+        return "hnsw"
+    # PQ only pays off once full vectors stop fitting comfortably in RAM
+    if num_vectors * dim * 4 < 4 * 1024 ** 3:
+        return "ivf_flat"
+    return "ivf_pq"
+
+
+def _pq_subquantizers(dim: int) -> int:
+    # Aim for ~8 dims per sub-quantizer; PQ needs m to divide dim
+    for m in range(max(1, dim // 8), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def default_index_params(index_type: str, num_vectors: int, dim: int, vector_dtype: str = "float32") -> Dict[str, Any]:
+    """Build + search parameters for an index family, sized for `num_vectors`."""
+    if index_type not in INDEX_TYPES or index_type == "auto":
+        raise ValueError(f"Unknown index type: {index_type} (expected one of {', '.join(INDEX_TYPES[1:])})")
+    if vector_dtype not in VECTOR_DTYPES:
+        raise ValueError(f"Unknown vector dtype: {vector_dtype} (expected one of {', '.join(VECTOR_DTYPES)})")
+    params: Dict[str, Any] = {"type": index_type, "storage": "pq" if index_type == "ivf_pq" else vector_dtype}
+    if index_type in TRAINED_INDEX_TYPES:
+        n = max(num_vectors, 1)
+        nlist = max(1, min(int(4 * n ** 0.5), 65536, n // 39 or 1))
+        params["nlist"] = nlist
+        params["nprobe"] = max(1, min(nlist, nlist // 16 or 1))
+        params["train_size"] = min(n, max(nlist * 64, 10_000), 500_000)
+    elif params["storage"] == "sq8":
+        # SQ8 learns per-dimension ranges from a sample
+        params["train_size"] = min(max(num_vectors, 1), 100_000)
+    if index_type == "ivf_pq":
+        params["pq_m"] = _pq_subquantizers(dim)
+        params["pq_nbits"] = 8
+    if index_type == "hnsw":
+        params["hnsw_m"] = 32
+        params["ef_construction"] = 80
+        params["ef_search"] = 64
+    return params
+
+
+def _needs_training(params: Dict[str, Any]) -> bool:
+    return params["type"] in TRAINED_INDEX_TYPES or params.get("storage") == "sq8"
+
+
+def _is_exact(params: Dict[str, Any]) -> bool:
+    return params["type"] == "flat" and params.get("storage", "float32") == "float32"
+
+
+def _index_factory_string(params: Dict[str, Any]) -> str:
+    index_type = params["type"]
+    sq = _SQ_FACTORY.get(params.get("storage", "float32"))
+    if index_type == "flat":
+        return sq or "Flat"
+    if index_type == "hnsw":
+        return f"HNSW{params['hnsw_m']}_{sq}" if sq else f"HNSW{params['hnsw_m']}"
+    if index_type == "ivf_flat":
+        return f"IVF{params['nlist']},{sq or 'Flat'}"
+    return f"IVF{params['nlist']},PQ{params['pq_m']}x{params['pq_nbits']}"
+
+
+def build_faiss_index(
+    embeddings: np.ndarray,
+    ids: List[int],
+    params: Optional[Dict[str, Any]] = None,
+) -> faiss.Index:
+    """
+    Build an id-addressable index of the given family (exact IndexFlatIP in an
+    IndexIDMap2 by default). IVF families hold the ids themselves, since
+    IndexIDMap2.remove_ids assumes Flat-style renumbering. Trained families are
+    trained on `embeddings`; `params` is updated in place with what was actually
+    used (e.g. nlist shrunk to fit a small sample).
+    """
     dim = embeddings.shape[1]
-    base_index = faiss.IndexFlatIP(dim)
-    index = faiss.IndexIDMap2(base_index)
+    if params is None:
+        params = {"type": "flat"}
+    n = len(embeddings)
+    if params["type"] == "ivf_pq" and n < 2 ** params.get("pq_nbits", 8):
+        print(f"Warning: {n} vectors is too few to train IVF-PQ; using IVF-Flat instead.")
+        params["type"] = "ivf_flat"
+    if params["type"] in TRAINED_INDEX_TYPES and params["nlist"] > n:
+        params["nlist"] = max(1, n // 39 or 1)
+        params["nprobe"] = min(params["nprobe"], params["nlist"])
+    base_index = faiss.index_factory(dim, _index_factory_string(params), faiss.METRIC_INNER_PRODUCT)
+    if params["type"] == "hnsw":
+        hnsw = faiss.downcast_index(base_index).hnsw
+        hnsw.efConstruction = params["ef_construction"]
+        hnsw.efSearch = params["ef_search"]
+    index = base_index if params["type"] in TRAINED_INDEX_TYPES else faiss.IndexIDMap2(base_index)
+    if _needs_training(params):
+        index.train(embeddings)
+        params["trained_on"] = n
+    if params["type"] in TRAINED_INDEX_TYPES:
+        ivf = faiss.extract_index_ivf(index)
+        ivf.nprobe = params["nprobe"]
+        # Lets vectors be reconstructed by id (e.g. when the family changes later)
+        ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
     ids_array = np.asarray(ids, dtype="int64")
     index.add_with_ids(embeddings, ids_array)
     return index
 
 
+class _RecallProbe:
+    """
+    Measures what an approximate/compressed index costs in recall@k against exact
+    inner-product search over the same float32 vectors. Up to `num_queries`
+    vectors from the first streamed chunk become queries; exact neighbours are accumulated chunk by
+    chunk, so the full matrix never has to be held. A query's own id is ignored.
+    """
+
+    def __init__(self, k: int = 10, num_queries: int = 100):
+        self.k = k
+        self.num_queries = num_queries
+        self.queries: Optional[np.ndarray] = None
+        self.query_ids = np.zeros(0, dtype="int64")
+        self._scores: Optional[np.ndarray] = None
+        self._ids: Optional[np.ndarray] = None
+
+    def observe(self, vectors: np.ndarray, ids: List[int]) -> None:
+        ids_array = np.asarray(ids, dtype="int64")
+        if self.queries is None:
+            self.queries = np.array(vectors[: self.num_queries], dtype="float32")
+            self.query_ids = ids_array[: len(self.queries)].copy()
+        scores = self.queries @ vectors.T
+        scores[self.query_ids[:, None] == ids_array[None, :]] = -np.inf
+        cand_ids = np.broadcast_to(ids_array, scores.shape)
+        if self._scores is not None and len(self._scores) == len(scores):
+            scores = np.hstack([self._scores, scores])
+            cand_ids = np.hstack([self._ids, cand_ids])
+        keep = min(self.k, scores.shape[1])
+        top = np.argpartition(-scores, keep - 1, axis=1)[:, :keep]
+        self._scores = np.take_along_axis(scores, top, axis=1)
+        self._ids = np.take_along_axis(cand_ids, top, axis=1)
+
+    def report(self, index: faiss.Index) -> Dict[str, Any]:
+        if self.queries is None or self._ids is None:
+            return {}
+        _, approx = index.search(self.queries, self.k + 1)
+        hits = []
+        for qid, exact_row, approx_row in zip(self.query_ids.tolist(), self._ids.tolist(), approx.tolist()):
+            exact = {i for i in exact_row if i != qid}
+            found = [i for i in approx_row if i != qid and i != -1][: self.k]
+            if exact:
+                hits.append(len(exact.intersection(found)) / len(exact))
+        return {
+            f"recall_at_{self.k}": round(float(np.mean(hits)), 4) if hits else 1.0,
+            "recall_queries": len(hits),
+            "recall_measured_on": int(index.ntotal),
+        }
+
+
+class _IndexBuilder:
+    """
+    Collects streamed (vectors, ids) chunks into a new index. Untrained families
+    are created from the first chunk; trained ones buffer up to `train_size`
+    vectors, train on them, then add everything after directly. Non-exact
+    indexes get their recall measured, with the figures stored in `params`.
+    """
+
+    def __init__(self, params: Dict[str, Any]):
+        self.params = params
+        self.index: Optional[faiss.Index] = None
+        self._vectors: List[np.ndarray] = []
+        self._ids: List[int] = []
+        self._buffered = 0
+        self._probe = None if _is_exact(params) else _RecallProbe()
+
+    def add(self, vectors: np.ndarray, ids: List[int]) -> None:
+        if self._probe is not None:
+            self._probe.observe(vectors, ids)
+        if self.index is not None:
+            self.index.add_with_ids(vectors, np.asarray(ids, dtype="int64"))
+            return
+        self._vectors.append(vectors)
+        self._ids.extend(ids)
+        self._buffered += len(vectors)
+        if not _needs_training(self.params) or self._buffered >= self.params.get("train_size", 0):
+            self._flush()
+
+    def _flush(self) -> None:
+        vectors = np.concatenate(self._vectors)
+        self.index = build_faiss_index(vectors, self._ids, self.params)
+        self._vectors, self._ids, self._buffered = [], [], 0
+
+    def finish(self) -> Optional[faiss.Index]:
+        if self.index is None and self._buffered:
+            self._flush()
+        if self.index is not None and self._probe is not None:
+            if self.params["type"] in TRAINED_INDEX_TYPES:
+                self.params.update(tune_nprobe(self.index, self._probe, self.params))
+            else:
+                self.params.update(self._probe.report(self.index))
+        return self.index
+
+
+def tune_nprobe(index: faiss.Index, probe: _RecallProbe, params: Dict[str, Any], target: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Double the IVF index's nprobe from params["nprobe"] until the probe's recall@k
+    reaches `target` (TARGET_RECALL), nprobe reaches nlist, or doubling stops
+    paying off. Leaves the chosen nprobe set on the index and returns it with its
+    recall figures, for the index metadata.
+    """
+    target = TARGET_RECALL if target is None else target
+    ivf = faiss.extract_index_ivf(index)
+    nlist = int(ivf.nlist)
+    nprobe = max(1, min(int(params.get("nprobe") or 1), nlist))
+    ivf.nprobe = nprobe
+    report = probe.report(index)
+    key = f"recall_at_{probe.k}"
+    while report.get(key, 1.0) < target and nprobe < nlist:
+        wider = min(nlist, nprobe * 2)
+        ivf.nprobe = wider
+        wider_report = probe.report(index)
+        if wider_report.get(key, 1.0) - report.get(key, 1.0) < _MIN_RECALL_GAIN:
+            ivf.nprobe = nprobe
+            break
+        nprobe, report = wider, wider_report
+    return {"nprobe": nprobe, "target_recall": target, **report}
+
+
+def remove_ids(index: faiss.Index, ids: List[int]) -> None:
+    ids_array = np.asarray(ids, dtype="int64")
+    if faiss.try_extract_index_ivf(index) is not None:
+        # The IVF hashtable direct map only accepts an explicit id array
+        index.remove_ids(faiss.IDSelectorArray(len(ids_array), faiss.swig_ptr(ids_array)))
+    else:
+        index.remove_ids(ids_array)
+
+
+def _iter_reconstructed(index: faiss.Index, ids: List[int], chunk_size: int = 4096) -> Iterator[Tuple[np.ndarray, List[int]]]:
+    """Yield stored vectors for `ids` in chunks (approximate for PQ indexes)."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and ivf.direct_map.type == faiss.DirectMap.NoMap:
+        ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        yield index.reconstruct_batch(np.asarray(chunk, dtype="int64")), chunk
+
+
 def save_index(index: faiss.Index, meta: Dict[str, Any], output_prefix: str) -> None:
     index_path = f"{output_prefix}.faiss"
     meta_path = f"{output_prefix}.meta.json"
@@ -96,9 +420,36 @@ def save_index(index: faiss.Index, meta: Dict[str, Any], output_prefix: str) ->
     dirpath = os.path.dirname(os.path.abspath(index_path))
     if dirpath:
         os.makedirs(dirpath, exist_ok=True)
-    faiss.write_index(index, index_path)
-    with open(meta_path, "w", encoding="utf-8") as f:
+    # Write-then-rename so processes that have the old files memory-mapped keep a valid view
+    faiss.write_index(index, index_path + ".tmp")
+    os.replace(index_path + ".tmp", index_path)
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
         json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(meta_path + ".tmp", meta_path)
+
+
+def _load_previous_index(output_prefix: str, model_name: str, backend: str) -> Optional[Tuple[faiss.Index, Dict[str, Any]]]:
+    """Return the existing index + metadata if it can serve as an embedding cache."""
+    index_path = f"{output_prefix}.faiss"
+    meta_path = f"{output_prefix}.meta.json"
+    if not os.path.exists(index_path) or not os.path.exists(meta_path):
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # Vectors from a different model/backend (or an index predating text hashes) can't be reused
+    has_hashes = os.path.exists(id_map_path(output_prefix)) or "id_to_text_hash" in meta
+    if meta.get("model_name") != model_name or not has_hashes:
+        return None
+    if meta.get("embed_backend", "torch") != backend:
+        return None
+    try:
+        index = faiss.read_index(index_path)
+    except Exception:
+        return None
+    return index, meta
 
 
 def vectorize_jobs(
@@ -106,28 +457,192 @@ def vectorize_jobs(
     output_prefix: str,
     model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
     batch_size: int = 64,
+    incremental: bool = True,
+    backend: Optional[str] = None,
+    token_budget: Optional[int] = None,
+    workers: Optional[int] = None,
+    index_type: Optional[str] = None,
+    vector_dtype: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
-    Build a FAISS index over the provided jobs JSON file and save index + metadata.
+    Build a FAISS index over the provided jobs file (JSON array or JSON Lines,
+    streamed one posting at a time) and save index + metadata.
+    When `incremental` is set and an index built with the same model exists at
+    `output_prefix`, postings whose (job id, text hash) are unchanged keep their
+    vectors; only new or edited postings are encoded and the index is updated in place.
+    `backend` selects the encoder ("torch", "onnx", "onnx-int8"; see model_registry)
+    and `token_budget` the padded tokens per encode batch (see build_embeddings).
+    `workers` > 1 encodes large scrapes on a process pool (WAT_MATCH_ENCODE_WORKERS).
+    `index_type` is one of INDEX_TYPES; "auto" (the default) sizes the family to
+    the corpus via choose_index_type. `vector_dtype` ("float32", "float16", "sq8")
+    selects scalar-quantized storage. Build/search parameters, and the measured
+    recall@10 for non-exact indexes, go in meta["index"]; IVF nprobe is raised
+    until recall@10 reaches TARGET_RECALL (see tune_nprobe). A BM25 keyword index
+    over the same texts, the filterable job attributes (backend.filters) and the
+    float32 embedding matrix (backend.embedding_store) are written alongside.
     Returns the metadata dictionary.
     """
-    jobs = read_jobs_json(jobs_json_path)
-    texts: List[str] = [job_to_text(job) for job in jobs]
-    internal_ids: List[int] = list(range(len(jobs)))
-    id_to_job_id = {str(i): str(jobs[i].get("id", i)) for i in internal_ids}
+    backend = resolve_backend(backend)
+    index_type = index_type or os.environ.get("WAT_MATCH_INDEX_TYPE") or "auto"
+    vector_dtype = vector_dtype or os.environ.get("WAT_MATCH_VECTOR_DTYPE") or "float32"
+    previous = _load_previous_index(output_prefix, model_name, backend) if incremental else None
+    # (job id, text hash) -> internal ids whose vectors can be kept as-is
+    reusable: Dict[Tuple[str, str], List[int]] = {}
+    next_id = 0
+    if previous is not None:
+        prev_index, prev_meta = previous
+        for iid, prev_job_id, h in load_id_map(output_prefix, prev_meta, mmap=False).entries():
+            reusable.setdefault((prev_job_id, h), []).append(iid)
+            next_id = max(next_id, iid + 1)
+
+    # Pick the index family; sizing needs the corpus size, which costs one cheap parse pass
+    num_jobs = 0
+    if index_type == "auto" or index_type in TRAINED_INDEX_TYPES or vector_dtype == "sq8":
+        num_jobs = sum(1 for _ in iter_jobs(jobs_json_path))
+    if previous is not None:
+        dim = int(prev_index.d)
+    else:
+        dim = int(get_model(model_name, backend=backend).get_sentence_embedding_dimension())
+    target_type = choose_index_type(num_jobs, dim) if index_type == "auto" else index_type
+
+    prev_params: Dict[str, Any] = (prev_meta.get("index") or {"type": "flat"}) if previous is not None else {}
+    target_storage = "pq" if target_type == "ivf_pq" else vector_dtype
+    in_place = (
+        previous is not None
+        and prev_params.get("type") == target_type
+        and prev_params.get("storage", "float32") == target_storage
+    )
+    if in_place and target_type in TRAINED_INDEX_TYPES and num_jobs > 4 * prev_params.get("trained_on", 0):
+        # Coarse quantizer was trained on a much smaller corpus; retrain
+        in_place = False
+
+    # Per-posting bookkeeping, in file order; texts themselves are never all held at once
+    job_ids: List[str] = []
+    hashes: List[str] = []
+    internal_ids: List[int] = []
+    new_ids: List[int] = []
+    # Keyword index over the same texts; cheap enough to rebuild on every run
+    lexical = BM25Builder()
+    # Structured fields for pre-filtering (city, level, deadline, ...)
+    attributes = AttributeBuilder()
+
+    def _pending_texts() -> Iterator[str]:
+        # Walk the jobs file once, yielding only texts that need encoding
+        nonlocal next_id
+        for pos, job in enumerate(iter_jobs(jobs_json_path)):
+            text = job_to_text(job)
+            key = (str(job.get("id", pos)), text_hash(text))
+            job_ids.append(key[0])
+            hashes.append(key[1])
+            bucket = reusable.get(key)
+            reused = bool(bucket)
+            if reused:
+                internal_ids.append(bucket.pop(0))
+            else:
+                internal_ids.append(next_id)
+                new_ids.append(next_id)
+                next_id += 1
+            lexical.add(internal_ids[-1], text)
+            attributes.add(internal_ids[-1], job)
+            if not reused:
+                yield text
+
+    index: Optional[faiss.Index] = None
+    builder: Optional[_IndexBuilder] = None
+    if in_place:
+        index = prev_index
+        params = prev_params
+    else:
+        params = default_index_params(target_type, num_jobs, dim, vector_dtype)
+        builder = _IndexBuilder(params)
+
+    # Stream encoded shards straight into the index (and the raw matrix sidecar)
+    matrix_writer = EmbeddingWriter(output_prefix, dim)
+    encode_stats: Dict[str, Any] = {}
+    offset = 0
+    for chunk in iter_embeddings(
+        _pending_texts(),
+        model_name,
+        backend=backend,
+        token_budget=token_budget,
+        workers=workers,
+        stats=encode_stats,
+    ):
+        chunk_ids = new_ids[offset:offset + len(chunk)]
+        offset += len(chunk)
+        matrix_writer.append(chunk, chunk_ids)
+        if builder is not None:
+            builder.add(chunk, chunk_ids)
+        else:
+            index.add_with_ids(chunk, np.asarray(chunk_ids, dtype="int64"))
+    if new_ids:
+        print(format_encode_stats(encode_stats))
+
+    if not internal_ids:
+        raise ValueError(f"No jobs to index in: {jobs_json_path}")
+    num_rows = max(internal_ids) + 1
+
+    # Lay out the full float32 matrix; unchanged rows come from the previous
+    # matrix when there is one (exact), else from the previous index
+    new_set = set(new_ids)
+    kept = [iid for iid in internal_ids if iid not in new_set]
+    carried: Iterator[Tuple[np.ndarray, List[int]]] = iter(())
+    if kept:
+        prev_matrix = load_embeddings(output_prefix)
+        if prev_matrix is not None and prev_matrix.shape[1] == dim and prev_matrix.shape[0] > max(kept):
+            carried = iter_rows(prev_matrix, kept)
+        else:
+            carried = _iter_reconstructed(prev_index, kept)
+    matrix = matrix_writer.finish(num_rows, carried)
 
-    embeddings = build_embeddings(texts, model_name, batch_size=batch_size)
-    index = build_faiss_index(embeddings, internal_ids)
+    # Whatever wasn't claimed by a current posting is stale
+    stale_ids = sorted(iid for bucket in reusable.values() for iid in bucket)
+    if builder is not None:
+        # Family changed: carry unchanged vectors over
+        for vectors, ids in iter_rows(matrix, kept):
+            builder.add(vectors, ids)
+        index = builder.finish()
+    elif stale_ids:
+        if params["type"] == "hnsw":
+            # HNSW doesn't support deletion; rebuild from the vectors that remain
+            builder = _IndexBuilder(params)
+            for vectors, ids in iter_rows(matrix, sorted(internal_ids)):
+                builder.add(vectors, ids)
+            index = builder.finish()
+        else:
+            remove_ids(index, stale_ids)
+    if builder is not None and "recall_at_10" in params:
+        at = f" at nprobe={params['nprobe']}/{params['nlist']}" if params["type"] in TRAINED_INDEX_TYPES else ""
+        print(f"Index recall@10 vs exact search: {params['recall_at_10']:.3f}{at} ({params['recall_queries']} queries)")
+        if params["type"] in TRAINED_INDEX_TYPES and params["recall_at_10"] < params["target_recall"]:
+            print(
+                f"Warning: recall@10 stays below the {params['target_recall']:.2f} target at any nprobe; "
+                f"{params.get('storage')} storage loses neighbours. Use ivf_flat with float32/float16 "
+                "vectors, or re-score candidates against the exact embedding matrix."
+            )
 
     meta = {
         "created_at": datetime.utcnow().isoformat() + "Z",
         "model_name": model_name,
-        "num_vectors": len(texts),
-        "dim": int(embeddings.shape[1]),
-        "id_to_job_id": id_to_job_id,
+        "embed_backend": backend,
+        "num_vectors": int(index.ntotal),
+        "dim": int(index.d),
+        "index": params,
+        "id_map": os.path.basename(id_map_path(output_prefix)),
+        "bm25": os.path.basename(bm25_path(output_prefix)),
+        "attributes": os.path.basename(attributes_path(output_prefix)),
+        "embeddings": os.path.basename(embeddings_path(output_prefix)),
+        "num_encoded": len(new_ids),
+        "num_reused": len(internal_ids) - len(new_ids),
+        "num_removed": len(stale_ids),
+        "encode_stats": encode_stats,
         "source": os.path.abspath(jobs_json_path),
     }
 
+    write_id_map(output_prefix, internal_ids, job_ids, hashes)
+    write_bm25(output_prefix, lexical.finish(num_rows=num_rows))
+    write_attributes(output_prefix, attributes.finish(num_rows=num_rows))
+    matrix_writer.commit()
     save_index(index, meta, output_prefix)
     return meta
 
@@ -135,8 +650,17 @@ def vectorize_jobs(
 __all__ = [
     "read_jobs_json",
     "job_to_text",
+    "text_hash",
+    "normalize_embeddings",
+    "iter_embeddings",
     "build_embeddings",
+    "INDEX_TYPES",
+    "VECTOR_DTYPES",
+    "choose_index_type",
+    "default_index_params",
+    "tune_nprobe",
     "build_faiss_index",
+    "remove_ids",
     "save_index",
     "vectorize_jobs",
 ]
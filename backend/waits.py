@@ -0,0 +1,151 @@
+import time
+import bisect
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+
+# Upper bound for any single wait (matches the scraper's ACTION_TIMEOUT)
+MAX_TIMEOUT_MS = 60000
+# Lower bound once a timeout has been learned; page loads vary a lot more than their median
+MIN_TIMEOUT_MS = 5000
+# Learned timeout = this multiple of the observed p99
+TIMEOUT_MARGIN = 4.0
+# Observations needed before a wait's timeout is learned rather than MAX_TIMEOUT_MS
+MIN_SAMPLES = 5
+WINDOW = 200
+HISTOGRAM_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class WaitStats:
+    """Latency samples and timeout counts per named wait, plus the timeouts learned from them."""
+
+    def __init__(self):
+        self.samples: Dict[str, Deque[float]] = {}
+        self.counts: Dict[str, int] = {}
+        self.timeouts: Dict[str, int] = {}
+        self.total_ms: Dict[str, float] = {}
+
+    def record(self, name: str, elapsed_ms: float, timed_out: bool = False) -> None:
+        # A timed-out wait still tells us the condition takes at least this long
+        self.samples.setdefault(name, deque(maxlen=WINDOW)).append(elapsed_ms)
+        self.counts[name] = self.counts.get(name, 0) + 1
+        self.total_ms[name] = self.total_ms.get(name, 0.0) + elapsed_ms
+        if timed_out:
+            self.timeouts[name] = self.timeouts.get(name, 0) + 1
+
+    def percentile(self, name: str, q: float) -> Optional[float]:
+        samples = sorted(self.samples.get(name) or ())
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def timeout_ms(self, name: str, ceiling_ms: float = MAX_TIMEOUT_MS) -> float:
+        """Timeout for the next `name` wait: a margin over its p99, within [MIN_TIMEOUT_MS, ceiling_ms]."""
+        if len(self.samples.get(name) or ()) < MIN_SAMPLES:
+            return ceiling_ms
+        p99 = self.percentile(name, 0.99) or 0.0
+        return max(min(MIN_TIMEOUT_MS, ceiling_ms), min(ceiling_ms, p99 * TIMEOUT_MARGIN))
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        out: Dict[str, Dict[str, Any]] = {}
+        for name in sorted(self.samples, key=lambda n: -self.total_ms.get(n, 0.0)):
+            histogram = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+            for ms in self.samples[name]:
+                histogram[bisect.bisect_left(HISTOGRAM_BUCKETS_MS, ms)] += 1
+            out[name] = {
+                "count": self.counts.get(name, 0),
+                "timeouts": self.timeouts.get(name, 0),
+                "total_s": round(self.total_ms.get(name, 0.0) / 1000.0, 2),
+                "p50_ms": round(self.percentile(name, 0.5) or 0.0, 1),
+                "p90_ms": round(self.percentile(name, 0.9) or 0.0, 1),
+                "p99_ms": round(self.percentile(name, 0.99) or 0.0, 1),
+                "timeout_ms": round(self.timeout_ms(name), 1),
+                "histogram": {
+                    (f"<={HISTOGRAM_BUCKETS_MS[i]}ms" if i < len(HISTOGRAM_BUCKETS_MS) else f">{HISTOGRAM_BUCKETS_MS[-1]}ms"): c
+                    for i, c in enumerate(histogram)
+                    if c
+                },
+            }
+        return out
+
+
+# Process-wide stats shared by every page/worker
+STATS = WaitStats()
+
+
+def _is_timeout(e: BaseException) -> bool:
+    # playwright.async_api.TimeoutError, without importing playwright here
+    return type(e).__name__ == "TimeoutError"
+
+
+async def timed_wait(
+    name: str,
+    wait: Callable[[float], Awaitable[Any]],
+    ceiling_ms: float = MAX_TIMEOUT_MS,
+    stats: Optional[WaitStats] = None,
+) -> Any:
+    """
+    Run `wait(timeout_ms)` with the timeout learned for `name` and record how long
+    it took. Timeouts are recorded too and re-raised.
+    """
+    stats = stats or STATS
+    timeout = stats.timeout_ms(name, ceiling_ms)
+    start = time.perf_counter()
+    try:
+        result = await wait(timeout)
+    except Exception as e:
+        if _is_timeout(e):
+            stats.record(name, (time.perf_counter() - start) * 1000.0, timed_out=True)
+        raise
+    stats.record(name, (time.perf_counter() - start) * 1000.0)
+    return result
+
+
+async def wait_visible(locator: Any, name: str, ceiling_ms: float = MAX_TIMEOUT_MS) -> None:
+    await timed_wait(name, lambda t: locator.wait_for(state="visible", timeout=t), ceiling_ms)
+
+
+async def wait_hidden(locator: Any, name: str, ceiling_ms: float = MAX_TIMEOUT_MS) -> None:
+    await timed_wait(name, lambda t: locator.wait_for(state="hidden", timeout=t), ceiling_ms)
+
+
+async def wait_selector(page: Any, selector: str, name: str, ceiling_ms: float = MAX_TIMEOUT_MS) -> Any:
+    return await timed_wait(name, lambda t: page.wait_for_selector(selector, timeout=t), ceiling_ms)
+
+
+async def wait_function(
+    page: Any,
+    expression: str,
+    name: str,
+    arg: Any = None,
+    polling: Any = "raf",
+    ceiling_ms: float = MAX_TIMEOUT_MS,
+) -> Any:
+    return await timed_wait(name, lambda t: page.wait_for_function(expression, arg=arg, polling=polling, timeout=t), ceiling_ms)
+
+
+def format_report(stats: Optional[WaitStats] = None) -> str:
+    """Per-wait timing table, slowest total first."""
+    report = (stats or STATS).report()
+    if not report:
+        return "No waits recorded."
+    lines = [f"{'wait':<22}{'count':>7}{'t/o':>5}{'total s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'next t/o':>10}"]
+    for name, row in report.items():
+        lines.append(
+            f"{name:<22}{row['count']:>7}{row['timeouts']:>5}{row['total_s']:>9.1f}"
+            f"{row['p50_ms']:>9.0f}{row['p90_ms']:>9.0f}{row['p99_ms']:>9.0f}{row['timeout_ms']:>10.0f}"
+        )
+        lines.append("    " + "  ".join(f"{bucket}: {count}" for bucket, count in row["histogram"].items()))
+    return "\n".join(lines)
+
+
+__all__ = [
+    "WaitStats",
+    "STATS",
+    "timed_wait",
+    "wait_visible",
+    "wait_hidden",
+    "wait_selector",
+    "wait_function",
+    "format_report",
+]
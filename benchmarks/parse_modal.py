@@ -0,0 +1,114 @@
+"""
+Job modal parsing speed and fidelity per HTML backend.
+
+Parses a corpus of saved modal HTML (scrape with WAT_MATCH_SAVE_MODAL_HTML=<dir>
+to collect one) with every available backend in backend/modal_parser.py, reports
+time per document and speed-up over bs4, and checks that each backend's output is
+identical to bs4's. Exits non-zero on any mismatch, so a backend is only switched
+on (WAT_MATCH_MODAL_PARSER) once it passes on real postings:
+
+    python benchmarks/parse_modal.py outputs/modal_html
+    python benchmarks/parse_modal.py outputs/modal_html --backends lxml selectolax --repeat 5 --json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from typing import Any, Dict, List, Optional, Tuple
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_ROOT)
+
+from backend.modal_parser import PARSER_BACKENDS, iter_saved_modals, parse_job_modal  # noqa: E402
+
+
+REFERENCE_BACKEND = "bs4"
+DEFAULT_CORPUS = os.path.join(REPO_ROOT, "outputs", "modal_html")
+
+
+def _first_difference(expected: Dict[str, Any], actual: Dict[str, Any]) -> str:
+    for key in sorted(set(expected) | set(actual)):
+        if expected.get(key) != actual.get(key):
+            return f"{key}: {expected.get(key)!r} != {actual.get(key)!r}"
+    return ""
+
+
+def measure(backend: str, corpus: List[Tuple[str, str]], repeat: int = 3) -> Dict[str, Any]:
+    """Parse the whole corpus `repeat` times with `backend`; the fastest pass counts."""
+    try:
+        parse_job_modal("", backend)
+    except RuntimeError as e:
+        return {"backend": backend, "error": str(e)}
+    best = float("inf")
+    outputs: List[Dict[str, Any]] = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        outputs = [parse_job_modal(html, backend) for _name, html in corpus]
+        best = min(best, time.perf_counter() - start)
+    return {
+        "backend": backend,
+        "total_ms": round(best * 1000.0, 2),
+        "ms_per_doc": round(best * 1000.0 / max(1, len(corpus)), 3),
+        "outputs": outputs,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="benchmarks/parse_modal.py", description="Benchmark job modal parser backends")
+    parser.add_argument("corpus", nargs="?", default=DEFAULT_CORPUS, help="Directory of saved modal .html files")
+    parser.add_argument("--backends", nargs="+", choices=PARSER_BACKENDS, default=list(PARSER_BACKENDS))
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the corpus per backend; the fastest counts")
+    parser.add_argument("--show", type=int, default=5, help="Mismatching documents to list per backend")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.corpus):
+        print(f"No corpus at {args.corpus}; scrape with WAT_MATCH_SAVE_MODAL_HTML={args.corpus} to collect one.")
+        return 1
+    corpus = list(iter_saved_modals(args.corpus))
+    if not corpus:
+        print(f"No .html files in {args.corpus}")
+        return 1
+
+    backends = [REFERENCE_BACKEND] + [b for b in args.backends if b != REFERENCE_BACKEND]
+    reports = [measure(backend, corpus, args.repeat) for backend in backends]
+    reference = reports[0]
+    if "error" in reference:
+        print(f"{REFERENCE_BACKEND}: FAILED ({reference['error']})")
+        return 1
+
+    expected_outputs = reference["outputs"]
+    failed = False
+    for report in reports:
+        outputs = report.pop("outputs", None)
+        if outputs is None:
+            continue
+        report["speedup"] = round(reference["total_ms"] / report["total_ms"], 2) if report["total_ms"] else None
+        report["mismatches"] = [
+            {"id": name, "difference": _first_difference(expected, actual)}
+            for (name, _html), expected, actual in zip(corpus, expected_outputs, outputs)
+            if expected != actual
+        ]
+        failed = failed or bool(report["mismatches"])
+
+    if args.json:
+        print(json.dumps({"documents": len(corpus), "backends": reports}, indent=2))
+    else:
+        print(f"{len(corpus)} documents from {args.corpus}")
+        for report in reports:
+            if "error" in report:
+                print(f"{report['backend']}: unavailable ({report['error']})")
+                continue
+            status = "MISMATCH" if report["mismatches"] else "ok"
+            print(
+                f"{report['backend']:<12}{report['ms_per_doc']:>9.3f} ms/doc"
+                f"{report['speedup']:>8.2f}x  [{status}]"
+            )
+            for mismatch in report["mismatches"][: args.show]:
+                print(f"    {mismatch['id']}: {mismatch['difference']}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+"""
+Cross-encoder re-ranking of one resume under several constraint files in one batch.
+
+Runs match_many with every (resume, constraints) pair in a single call, the way
+constraint variants of one resume are matched together, and checks that a job
+re-ranked for one of the queries carries its rerank_score in every other query
+that returns it (the pair is scored once and shared). Exits non-zero on any gap:
+
+    python benchmarks/rerank_batch.py outputs/jobs_index resume.pdf remote.txt toronto.txt
+    python benchmarks/rerank_batch.py outputs/jobs_index resume.pdf a.txt b.txt --rerank-model cross-encoder/ms-marco-MiniLM-L-6-v2 --json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_ROOT)
+
+from backend.matcher import match_many  # noqa: E402
+
+
+DEFAULT_RERANK_MODEL = os.environ.get("WAT_MATCH_RERANK_MODEL") or "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+def missing_scores(results: List[List[Dict[str, Any]]], labels: List[str]) -> List[Dict[str, Any]]:
+    """Results without a rerank_score whose job was re-ranked for another query."""
+    scored = {r["job_id"]: label for res, label in zip(results, labels) for r in res if r.get("rerank_score") is not None}
+    return [
+        {"query": label, "job_id": r["job_id"], "scored_for": scored[r["job_id"]]}
+        for res, label in zip(results, labels)
+        for r in res
+        if r.get("rerank_score") is None and r["job_id"] in scored
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="benchmarks/rerank_batch.py", description="Check batched re-ranking of constraint variants")
+    parser.add_argument("index_prefix", help="Index prefix written by the vectorizer")
+    parser.add_argument("resume", help="Resume file shared by every query")
+    parser.add_argument("constraints", nargs="+", help="Constraint files, one query each")
+    parser.add_argument("--rerank-model", default=DEFAULT_RERANK_MODEL)
+    parser.add_argument("--top-k", type=int, default=10)
+    # Large enough that the budget never cuts the depth, so every returned job can be re-ranked
+    parser.add_argument("--budget-ms", type=float, default=1e9)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    queries = [(args.resume, path) for path in args.constraints]
+    start = time.perf_counter()
+    results = match_many(
+        queries,
+        args.index_prefix,
+        top_k=args.top_k,
+        rerank_model=args.rerank_model,
+        rerank_budget_ms=args.budget_ms,
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+    gaps = missing_scores(results, list(args.constraints))
+
+    if args.json:
+        print(json.dumps({"queries": len(queries), "ms": round(elapsed_ms, 1), "missing": gaps}, indent=2))
+    else:
+        print(f"{len(queries)} queries on {args.resume} in {elapsed_ms:.1f} ms")
+        for label, res in zip(args.constraints, results):
+            reranked = sum(1 for r in res if r.get("rerank_score") is not None)
+            print(f"  {label}: {reranked}/{len(res)} re-ranked")
+        for gap in gaps:
+            print(f"    MISSING {gap['query']}: job {gap['job_id']} was re-ranked for {gap['scored_for']}")
+    return 1 if gaps else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,132 @@
+"""
+Startup cost of the CLI and GUI entry modules.
+
+Imports each target in a fresh interpreter with `-X importtime` and reports the
+cumulative import time of the target and of its slowest dependencies. Exits
+non-zero when a target goes over its budget or pulls in one of the heavy
+packages that must stay lazy, so startup doesn't creep back up:
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --budget-ms 800 --top 15 --json
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+from typing import Any, Dict, List, Optional, Tuple
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_TARGETS = ("main", "ui")
+DEFAULT_BUDGET_MS = float(os.environ.get("WAT_MATCH_STARTUP_BUDGET_MS", "1000"))
+# Imported on first use only; any of these at startup is a regression
+LAZY_PACKAGES = (
+    "torch",
+    "sentence_transformers",
+    "faiss",
+    "playwright",
+    "bs4",
+    "anthropic",
+    "fitz",
+    "onnxruntime",
+)
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, float, float]]:
+    """(module, self ms, cumulative ms) per `import time:` line."""
+    rows: List[Tuple[str, float, float]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue
+        rows.append((parts[2].strip(), self_us / 1000.0, cumulative_us / 1000.0))
+    return rows
+
+
+def measure(target: str, repeat: int = 3) -> Dict[str, Any]:
+    """Import `target` `repeat` times in fresh interpreters and keep the fastest run."""
+    best: Optional[List[Tuple[str, float, float]]] = None
+    for _ in range(max(1, repeat)):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+            return {"target": target, "error": error}
+        rows = _parse_importtime(proc.stderr)
+        if best is None or _total_ms(rows, target) < _total_ms(best, target):
+            best = rows
+    rows = best or []
+    loaded = {name for name, _self_ms, _cum_ms in rows}
+    return {
+        "target": target,
+        "total_ms": round(_total_ms(rows, target), 2),
+        "slowest": [
+            {"module": name, "self_ms": round(self_ms, 2), "cumulative_ms": round(cum_ms, 2)}
+            for name, self_ms, cum_ms in sorted(rows, key=lambda r: -r[2])
+            if name != target
+        ],
+        "eager_heavy": sorted(p for p in LAZY_PACKAGES if p in loaded),
+    }
+
+
+def _total_ms(rows: List[Tuple[str, float, float]], target: str) -> float:
+    for name, _self_ms, cum_ms in rows:
+        if name == target:
+            return cum_ms
+    return float("inf")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="benchmarks/startup.py", description="Measure and gate CLI/GUI import time")
+    parser.add_argument("targets", nargs="*", default=list(DEFAULT_TARGETS), help="Modules to import (default: main ui)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Max cumulative import time per target")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per target; the fastest run counts")
+    parser.add_argument("--top", type=int, default=10, help="Slowest dependencies to list")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    reports = [measure(target, args.repeat) for target in args.targets]
+    failed = False
+    for report in reports:
+        report["slowest"] = report.get("slowest", [])[: args.top]
+        if "error" in report:
+            failed = True
+            report["problems"] = [f"import failed: {report['error']}"]
+            continue
+        problems = []
+        if report["total_ms"] > args.budget_ms:
+            problems.append(f"{report['total_ms']:.0f} ms over the {args.budget_ms:.0f} ms budget")
+        if report["eager_heavy"]:
+            problems.append(f"imports heavy packages at startup: {', '.join(report['eager_heavy'])}")
+        report["problems"] = problems
+        failed = failed or bool(problems)
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for report in reports:
+            if "error" in report:
+                print(f"{report['target']}: FAILED ({report['error']})")
+                continue
+            status = "FAIL" if report["problems"] else "ok"
+            print(f"{report['target']}: {report['total_ms']:.1f} ms [{status}]")
+            for row in report["slowest"]:
+                print(f"  {row['cumulative_ms']:9.1f} ms  {row['module']}")
+            for problem in report["problems"]:
+                print(f"  ! {problem}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -15,14 +15,11 @@ import asyncio
 
 # Suppress tokenizer parallelism warnings
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
-from backend.vectorizer import vectorize_jobs
-from backend.matcher import match_resume_to_jobs
-from backend.scraper import scrape_jobs
-from backend.personalizer import personalize_resume_and_cover_letter
-from backend.upload import upload_for_jobs
+# Heavy pipeline stages (playwright, faiss, anthropic) are imported where they run
+from backend.match_service import match_resume_to_jobs
+from backend.model_registry import warmup
 
 # TO ADD:
-# deterministic filtering of jobs based on location, job title, compensation, etc.
 # add textbox to the vectorizer
 # apply to the jobs
 
@@ -117,27 +114,34 @@ if __name__ == "__main__":
     COVER_PATH = os.path.abspath(os.path.join(BASE_DIR, cfg["cover_path"]))
     PERSONALIZE_MODEL = cfg["personalize_model"]
     EMBED_MODEL = cfg["embed_model"]
+    EMBED_BACKEND = cfg.get("embed_backend", "torch")
     PERSONALIZED_DIR = os.path.abspath(os.path.join(BASE_DIR, cfg["personalized_dir"]))
 
+    # Load the embedding model in the background while setup/scraping run
+    warmup([EMBED_MODEL], backend=EMBED_BACKEND)
+
     # 0) Setup external dependencies (non-interactive)
     setup_dependencies()
     test_setup()
 
     # 1) Always scrape (interactive)
     print("Starting scraping session... (interactive)")
-    JOBS_PATH = scrape_jobs(max_jobs=MAX_JOBS)
+    from backend.scraper import scrape_jobs
+    JOBS_PATH = scrape_jobs(max_jobs=MAX_JOBS, workers=cfg.get("scrape_workers"))
     print(f"Scraped jobs saved to: {JOBS_PATH}")
 
     # 2) Build/refresh FAISS index
-    meta = vectorize_jobs(jobs_json_path=JOBS_PATH, output_prefix=INDEX_PREFIX, model_name=EMBED_MODEL)
+    from backend.vectorizer import vectorize_jobs
+    meta = vectorize_jobs(jobs_json_path=JOBS_PATH, output_prefix=INDEX_PREFIX, model_name=EMBED_MODEL, backend=EMBED_BACKEND, workers=cfg.get("encode_workers"), index_type=cfg.get("index_type"), vector_dtype=cfg.get("vector_dtype"))
     print("Index built:", json.dumps({k: meta[k] for k in ["num_vectors", "model_name", "dim"]}, indent=2))
 
     # 3) Match resume against index
-    results = match_resume_to_jobs(resume_path=RESUME_PATH, index_prefix=INDEX_PREFIX, top_k=TOP_K)
+    results = match_resume_to_jobs(resume_path=RESUME_PATH, index_prefix=INDEX_PREFIX, top_k=TOP_K, model_name=EMBED_MODEL, filters=cfg.get("filters"), rerank_model=cfg.get("rerank_model"), rerank_budget_ms=cfg.get("rerank_budget_ms"), section_mode=cfg.get("section_mode"), service_port=cfg.get("match_service_port"))
     print(json.dumps({"top_k": TOP_K, "results": results}, ensure_ascii=False, indent=2))
 
     # 4) Personalize the resume and cover letter to the selected id's
     selected_ids = [r["job_id"] for r in results]
+    from backend.personalizer import personalize_resume_and_cover_letter
     personalize_resume_and_cover_letter(
         RESUME_PATH,
         COVER_PATH,
@@ -148,6 +152,7 @@ if __name__ == "__main__":
     )
     # 5) Upload personalized documents for the selected job IDs
     try:
+        from backend.upload import upload_for_jobs
         asyncio.run(upload_for_jobs(selected_ids, out_dir=PERSONALIZED_DIR))
     except Exception as e:
         print(f"Upload step failed: {e}")
\ No newline at end of file